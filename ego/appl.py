@@ -46,6 +46,7 @@ if __name__ == '__main__':
     logger.info('Start calculation')
 
     ego = eGo(jsonpath='scenario_setting.json')
+    ego.report_performance()
 #    logger.info('Print results')
 #    ego.etrago_line_loading()
 #    print(ego.etrago.generator)
@@ -24,13 +24,15 @@ which can mainly distinguished in operational and investment costs.
 import io
 import pkgutil
 import os
+import time
 import logging
 logger = logging.getLogger('ego')
 
 if not 'READTHEDOCS' in os.environ:
     import pandas as pd
     import numpy as np
-    from ego.tools.utilities import get_time_steps
+    from ego.tools.utilities import get_time_steps, voltage_levels
+    from ego.tools import profiling
     from etrago.tools.utilities import geolocation_buses
 
 __copyright__ = "Flensburg University of Applied Sciences, Europa-Universität"\
@@ -171,7 +173,8 @@ def etrago_operating_costs(network):
     -------
     operating_costs :  :pandas:`pandas.Dataframe<dataframe>`
         DataFrame with aggregate operational costs per component and voltage
-        level in [EUR] per calculated time steps.
+        level in [EUR] per calculated time steps. The slack generator is
+        not included. The network is not changed.
 
     Example
     -------
@@ -196,97 +199,49 @@ def etrago_operating_costs(network):
 
     etg = network
 
-    # get v_nom
-    _bus = pd.DataFrame(etg.buses['v_nom'])
-    _bus.index.name = "name"
-    _bus.reset_index(level=0, inplace=True)
-
-    # Add voltage level
-    idx = etg.generators.index
-    etg.generators = pd.merge(etg.generators, _bus,
-                              left_on='bus', right_on='name')
-    etg.generators.index = idx
-
-    etg.generators['voltage_level'] = 'unknown'
-
-    # add ehv
-    ix_ehv = etg.generators[etg.generators['v_nom'] >= 380].index
-    etg.generators.set_value(ix_ehv, 'voltage_level', 'ehv')
-    # add hv
-    ix_hv = etg.generators[(etg.generators['v_nom'] <= 220) &
-                           (etg.generators['v_nom'] >= 110)].index
-    etg.generators.set_value(ix_hv, 'voltage_level', 'hv')
-
-    # get voltage_level index
-    ix_by_ehv = etg.generators[etg.generators.voltage_level == 'ehv'].index
-    ix_by_hv = etg.generators[etg.generators.voltage_level == 'hv'].index
-    ix_slack = etg.generators[etg.generators.control != 'Slack'].index
-
-    ix_by_ehv = ix_slack.join(ix_by_ehv, how='left', level=None,
-                              return_indexers=False, sort=False)
-    ix_by_hv = ix_slack.join(ix_by_hv, how='right', level=None,
-                             return_indexers=False, sort=False)
-
-    # groupby v_nom ehv
-    operating_costs_ehv = (etg.generators_t.p[ix_by_ehv] *
-                           etg.generators. marginal_cost[ix_by_ehv])
-    operating_costs_ehv = operating_costs_ehv.groupby(
-        etg.generators.carrier, axis=1).sum().sum()
-
-    operating_costs = pd.DataFrame(operating_costs_ehv)
-    operating_costs.columns = ['operation_costs']
-    operating_costs['voltage_level'] = 'ehv'
-    # groupby v_nom ehv
-    operating_costs_hv = (etg.generators_t.p[ix_by_hv] *
-                          etg.generators. marginal_cost[ix_by_hv])
-    operating_costs_hv = operating_costs_hv.groupby(
-        etg.generators.carrier, axis=1).sum().sum()
-
-    opt_costs_hv = pd.DataFrame(operating_costs_hv)
-    opt_costs_hv.columns = ['operation_costs']
-    opt_costs_hv['voltage_level'] = 'hv'
-    # add df
-    operating_costs = operating_costs.append(opt_costs_hv)
-
-    tpc_ehv = pd.DataFrame(operating_costs_ehv.sum(),
-                           columns=['operation_costs'],
-                           index=['total_power_costs'])
-    tpc_ehv['voltage_level'] = 'ehv'
-    operating_costs = operating_costs.append(tpc_ehv)
-
-    tpc_hv = pd.DataFrame(operating_costs_hv.sum(),
-                          columns=['operation_costs'],
-                          index=['total_power_costs'])
-    tpc_hv['voltage_level'] = 'hv'
-    operating_costs = operating_costs.append(tpc_hv)
+    # Generators except the slack, with the voltage level of their bus
+    generators = etg.generators[etg.generators.control != 'Slack']
+    voltage_level = voltage_levels(etg, 'generators')[
+        generators.index].astype(str)
+
+    # operation costs = dispatch of all time steps * marginal costs
+    dispatch = etg.generators_t.p.reindex(
+        columns=generators.index, fill_value=0.)
+    costs = pd.DataFrame({
+        'operation_costs': dispatch.sum() * generators.marginal_cost,
+        'voltage_level': voltage_level,
+        'carrier': generators.carrier})
+    costs = costs[costs.voltage_level.isin(['ehv', 'hv'])]
+
+    # groupby carrier and voltage level
+    power_costs = costs.groupby(
+        ['voltage_level', 'carrier']).operation_costs.sum().reset_index(
+        'voltage_level')
+
+    total_power_costs = costs.groupby(
+        'voltage_level').operation_costs.sum().reindex(
+        ['ehv', 'hv'], fill_value=0.).reset_index()
+    total_power_costs.index = ['total_power_costs'] * len(total_power_costs)
 
     # add Grid and Transform Costs
     try:
-        etg.lines['voltage_level'] = 'unknown'
-        ix_ehv = etg.lines[etg.lines['v_nom'] >= 380].index
-        etg.lines.set_value(ix_ehv, 'voltage_level', 'ehv')
-        ix_hv = etg.lines[(etg.lines['v_nom'] <= 220) &
-                          (etg.lines['v_nom'] >= 110)].index
-        etg.lines.set_value(ix_hv, 'voltage_level', 'hv')
-
-        losses_total = sum(etg.lines.losses) + sum(etg.transformers.losses)
+        losses_total = etg.lines.losses.sum() + etg.transformers.losses.sum()
         losses_costs = losses_total * np.average(etg.buses_t.marginal_price)
 
-        # add Transform and Grid losses
-        # etg.lines[['losses','voltage_level']].groupby('voltage_level',
-        # axis=0).sum().reset_index()
-
     except AttributeError:
         logger.info("No Transform and Line losses are calcualted! \n"
                     "Use eTraGo pf_post_lopf method")
         losses_total = 0
         losses_costs = 0
     # total grid losses costs
-    tgc = pd.DataFrame(losses_costs,
-                       columns=['operation_costs'],
+    tgc = pd.DataFrame({'operation_costs': [losses_costs],
+                        'voltage_level': ['ehv/hv']},
                        index=['total_grid_losses'])
-    tgc['voltage_level'] = 'ehv/hv'
-    operating_costs = operating_costs.append(tgc)
+
+    operating_costs = pd.concat(
+        [power_costs, total_power_costs, tgc])[
+        ['operation_costs', 'voltage_level']]
+    operating_costs.index.name = None
 
     #power_price = power_price.T.iloc[0]
 
@@ -336,7 +291,8 @@ def etrago_grid_investment(network, json_file, session):
 
     if 'network' in json_file['eTraGo']['extendable']:
 
-        network = geolocation_buses(network, session)
+        with profiling.timer('Economics: Geolocation of buses'):
+            network = geolocation_buses(network, session)
         # differentiation by country_code
 
         network.lines['differentiation'] = 'none'
@@ -369,13 +325,8 @@ def etrago_grid_investment(network, json_file, session):
         lines['time_step'] = get_time_steps(json_file)
 
         # add v_level
-        lines['voltage_level'] = 'unknown'
-
-        ix_ehv = lines[lines['v_nom'] >= 380].index
-        lines.set_value(ix_ehv, 'voltage_level', 'ehv')
-
-        ix_hv = lines[(lines['v_nom'] <= 220) & (lines['v_nom'] >= 110)].index
-        lines.set_value(ix_hv, 'voltage_level', 'hv')
+        lines['voltage_level'] = voltage_levels(
+            network, 'lines').astype(str).values
 
         # based on eTraGo Function:
         # https://github.com/openego/eTraGo/blob/dev/etrago/tools/utilities.py#L651
@@ -403,15 +354,9 @@ def etrago_grid_investment(network, json_file, session):
             trafos['number_of_expansion'] = trafos.s_nom_extendable > 0.0
             trafos['time_step'] = get_time_steps(json_file)
             # add v_level
-            trafos['voltage_level'] = 'unknown'
-
             # TODO check
-            ix_ehv = trafos[trafos['v_nom0'] >= 380].index
-            trafos.set_value(ix_ehv, 'voltage_level', 'ehv')
-
-            ix_hv = trafos[(trafos['v_nom0'] <= 220) &
-                           (trafos['v_nom0'] >= 110)].index
-            trafos.set_value(ix_hv, 'voltage_level', 'hv')
+            trafos['voltage_level'] = voltage_levels(
+                network, 'transformers').astype(str)
             # aggregate trafo
             trafo = trafos[['voltage_level',
                             'capital_cost',
@@ -453,6 +398,8 @@ def edisgo_grid_investment(edisgo, json_file):
         Dataframe containing annuity costs per voltage level
     """
 
+    t0 = time.perf_counter()
+
     t = 40
     p = 0.05
     logger.info('For all components T={} and p={} is used'.format(t, p))
@@ -528,6 +475,9 @@ def edisgo_grid_investment(edisgo, json_file):
                 aggr_costs[['capital_cost', 'overnight_costs']]
                 / successfull_grids)
 
+    profiling.record(
+        'Economics: eDisGo grid investment', time.perf_counter() - t0)
+
     return aggr_costs
 
 
@@ -36,10 +36,13 @@ import traceback
 import pypsa
 import csv
 import dill
+import numpy as np
 import pandas as pd
-from time import localtime, sleep, strftime
+from time import localtime, perf_counter, sleep, strftime
 from datetime import datetime, timedelta as td
 import json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import scoped_session
 import multiprocess as mp2
@@ -53,15 +56,28 @@ if not 'READTHEDOCS' in os.environ:
     from edisgo.grid import tools
     from edisgo.tools.plots import mv_grid_topology
     from edisgo.grid.network import EDisGo
+    from scipy.stats import t as student_t
 
     from ego.tools.specs import (
-        get_etragospecs_direct
+        get_etragospecs_direct,
+        get_critical_timesteps
     )
     from ego.tools.mv_cluster import (
         analyze_attributes,
-        cluster_mv_grids)
+        cluster_mv_grids,
+        evaluate_no_grids,
+        choose_no_grids,
+        cluster_cache_key,
+        load_cached_clustering,
+        save_cached_clustering,
+        list_ding0_files,
+        load_grid_summary,
+        write_grid_choice,
+        read_grid_choice)
     from ego.tools.economics import (
         edisgo_grid_investment)
+    from ego.tools import profiling
+    from ego.tools import edisgo_store
 
 
 # Logging
@@ -103,8 +119,15 @@ class EDisGoNetworks:
         # eDisGo Result grids
         self._edisgo_grids = {}
 
+        # Evaluated numbers of clusters (only if no_grids is 'auto')
+        self._cluster_diagnostics = None
+
+        # Heavy results (grid topologies and s_res) of the imported grids
+        self._result_cache = _LRUCache(self._max_cached_results)
+
         if self._csv_import:
-            self._laod_edisgo_results()
+            with profiling.timer('eDisGo: Result import'):
+                self._laod_edisgo_results()
             self._successfull_grids = self._successfull_grids()
             self._grid_investment_costs = edisgo_grid_investment(
                 self,
@@ -123,7 +146,8 @@ class EDisGoNetworks:
                 # Execute Functions
                 self._set_grid_choice()
                 self._init_status()
-                self._run_edisgo_pool()
+                with profiling.timer('eDisGo: All MV grids'):
+                    self._run_edisgo_pool()
                 if self._results:
                     self._save_edisgo_results()
 
@@ -247,7 +271,7 @@ class EDisGoNetworks:
         For more information see :func:`edisgo.tools.plots.mv_grid_topology`.
         """
         mv_grid_topology(
-            self._edisgo_grids[mv_grid_id].network.pypsa,
+            self._edisgo_grids[mv_grid_id].network.pypsa.to_pypsa(),
             self._edisgo_grids[mv_grid_id].network.config,
             node_color=kwargs.get('storage_integration', None),
             filename=kwargs.get('filename', None),
@@ -263,7 +287,7 @@ class EDisGoNetworks:
         """
 
         mv_grid_topology(
-            self._edisgo_grids[mv_grid_id].network.pypsa,
+            self._edisgo_grids[mv_grid_id].network.pypsa.to_pypsa(),
             self._edisgo_grids[mv_grid_id].network.config,
             line_color='expansion_costs',
             grid_expansion_costs=(
@@ -286,7 +310,7 @@ class EDisGoNetworks:
         """
 
         mv_grid_topology(
-            self._edisgo_grids[mv_grid_id].network.pypsa,
+            self._edisgo_grids[mv_grid_id].network.pypsa.to_pypsa(),
             self._edisgo_grids[mv_grid_id].network.config,
             timestep=kwargs.get('timestep', None),
             line_color='loading',
@@ -309,15 +333,15 @@ class EDisGoNetworks:
         For more information see :func:`edisgo.tools.plots.mv_grid_topology`.
         """
 
-        mv_grid_topology(self._edisgo_grids[mv_grid_id].network.pypsa,
-                         self._edisgo_grids[mv_grid_id].network.config,
-                         filename=kwargs.get('filename', None),
-                         grid_district_geom=kwargs.get(
-                             'grid_district_geom', True),
-                         background_map=kwargs.get('background_map', True),
-                         xlim=kwargs.get('xlim', None),
-                         ylim=kwargs.get('ylim', None),
-                         title=kwargs.get('title', ''))
+        mv_grid_topology(
+            self._edisgo_grids[mv_grid_id].network.pypsa.to_pypsa(),
+            self._edisgo_grids[mv_grid_id].network.config,
+            filename=kwargs.get('filename', None),
+            grid_district_geom=kwargs.get('grid_district_geom', True),
+            background_map=kwargs.get('background_map', True),
+            xlim=kwargs.get('xlim', None),
+            ylim=kwargs.get('ylim', None),
+            title=kwargs.get('title', ''))
 
     def _init_status(self):
         """
@@ -488,6 +512,8 @@ class EDisGoNetworks:
         self._db_section = self._edisgo_args['db']
         self._grid_version = self._edisgo_args['gridversion']
         self._timesteps_pfa = self._edisgo_args['timesteps_pfa']
+        self._no_critical_timesteps = self._edisgo_args.get(
+            'no_critical_timesteps', 10)
         self._solver = self._edisgo_args['solver']
         self._curtailment_voltage_threshold = self._edisgo_args[
             'curtailment_voltage_threshold']
@@ -499,6 +525,24 @@ class EDisGoNetworks:
         self._storage_distribution = self._edisgo_args['storage_distribution']
         self._apply_curtailment = self._edisgo_args['apply_curtailment']
         self._cluster_attributes = self._edisgo_args['cluster_attributes']
+        self._cluster_backend = self._edisgo_args.get(
+            'cluster_backend', 'kmeans')
+        self._cluster_sample_size = self._edisgo_args.get(
+            'cluster_sample_size', None)
+        self._cluster_error_target = self._edisgo_args.get(
+            'cluster_error_target', 0.05)
+        self._max_no_grids = self._edisgo_args.get('max_no_grids', 50)
+        self._reuse_results = self._edisgo_args.get('reuse_results', False)
+        self._anytime_tolerance = self._edisgo_args.get(
+            'anytime_tolerance', None)
+        self._anytime_min_grids = self._edisgo_args.get(
+            'anytime_min_grids', 5)
+        self._anytime_min_weight_share = self._edisgo_args.get(
+            'anytime_min_weight_share', 0.2)
+        self._anytime_strata = self._edisgo_args.get('anytime_strata', 3)
+        self._anytime_seed = self._edisgo_args.get('anytime_seed', 0)
+        self._max_cached_results = self._edisgo_args.get(
+            'max_cached_results', 20)
         self._only_cluster = self._edisgo_args['only_cluster']
         self._max_workers = self._edisgo_args['max_workers']
         self._max_cos_phi_renewable = self._edisgo_args[
@@ -560,8 +604,10 @@ class EDisGoNetworks:
         for clustering.
         These are considered the "standard" attributes for the MV grid
         clustering.
+        The attributes are taken from the summary of all ding0 grids, which
+        is built (or updated) in parallel.
         """
-        analyze_attributes(self._ding0_files)
+        analyze_attributes(self._ding0_files, workers=self._max_workers)
 
     def _cluster_mv_grids(
             self,
@@ -570,10 +616,17 @@ class EDisGoNetworks:
         Clusters the MV grids based on the attributes, for a given number
         of MV grids
 
+        Clustering results are cached in the folder ``cluster_cache`` in
+        **ding0_files**. If the attributes and the clustering settings that
+        affect the result are unchanged, the cached results are used.
+
         Parameters
         ----------
-        no_grids : int
-            Desired number of clusters (of MV grids)
+        no_grids : int or :obj:`str`
+            Desired number of clusters (of MV grids). If ``'auto'``, the
+            smallest number of clusters from which on the cluster error
+            target is met is chosen (see
+            :func:`ego.tools.mv_cluster.choose_no_grids`)
 
         Returns
         -------
@@ -585,12 +638,9 @@ class EDisGoNetworks:
         # TODO: This first dataframe contains the standard attributes...
         # ...Create an Interface in order to use attributes more flexibly.
         # Make this function more generic.
-        attributes_path = self._ding0_files + '/attributes.csv'
 
-        if not os.path.isfile(attributes_path):
-            logger.info('Attributes file is missing')
-            logger.info('Attributes will be calculated')
-            self._analyze_cluster_attributes()
+        # Only new or changed ding0 grid files are analysed
+        self._analyze_cluster_attributes()
 
         df = pd.read_csv(self._ding0_files + '/attributes.csv')
         df = df.set_index('id')
@@ -638,9 +688,54 @@ class EDisGoNetworks:
                             'extendable storage in order to include '
                             'storage extension in MV grid clustering.')
 
-        return cluster_mv_grids(
+        # Only the settings that affect the clustering are part of the key
+        cache_parameters = {
+            'no_grids': no_grids,
+            'backend': self._cluster_backend}
+        if self._cluster_backend == 'coreset':
+            cache_parameters['sample_size'] = self._cluster_sample_size
+        if no_grids == 'auto':
+            cache_parameters['cluster_error_target'] = \
+                self._cluster_error_target
+            cache_parameters['max_no_grids'] = self._max_no_grids
+
+        cache_key = cluster_cache_key(df, **cache_parameters)
+        cached = load_cached_clustering(self._ding0_files, cache_key)
+        if cached is not None:
+            logger.info(
+                'Clustering inputs unchanged, cached clustering is used')
+            cluster_df, self._cluster_diagnostics = cached
+            return cluster_df
+
+        if no_grids == 'auto':
+            logger.info(
+                'Evaluating up to {} MV grid clusters'.format(
+                    self._max_no_grids))
+            self._cluster_diagnostics = evaluate_no_grids(
+                df,
+                range(2, self._max_no_grids + 1),
+                backend=self._cluster_backend,
+                sample_size=self._cluster_sample_size,
+                workers=self._max_workers)
+            no_grids = choose_no_grids(
+                self._cluster_diagnostics,
+                self._cluster_error_target)
+
+        logger.info('Clustering to {} MV grids'.format(no_grids))
+
+        cluster_df = cluster_mv_grids(
             no_grids,
-            cluster_base=df)
+            cluster_base=df,
+            backend=self._cluster_backend,
+            sample_size=self._cluster_sample_size)
+
+        save_cached_clustering(
+            self._ding0_files,
+            cache_key,
+            cluster_df,
+            self._cluster_diagnostics)
+
+        return cluster_df
 
     def _identify_extended_storages(self):
 
@@ -651,37 +746,33 @@ class EDisGoNetworks:
 
         all_mv_grids = self._check_available_mv_grids()
 
-        storages = pd.DataFrame(
-            index=all_mv_grids,
-            columns=['storage_p_nom'])
-
         logger.info('Identifying extended storage')
-        for mv_grid in all_mv_grids:
-            bus_id = self._get_bus_id_from_mv_grid(session, mv_grid)
-
-            min_extended = 0.3
-            stor_p_nom = self._etrago_network.storage_units.loc[
-                (self._etrago_network.storage_units['bus'] == str(bus_id))
-                & (self._etrago_network.storage_units[
-                    'p_nom_extendable'
-                ] == True)
-                & (self._etrago_network.storage_units[
-                    'p_nom_opt'
-                ] > min_extended)
-                & (self._etrago_network.storage_units['max_hours'] <= 20.)
-            ]['p_nom_opt']
-
-            if len(stor_p_nom) == 1:
-                stor_p_nom = stor_p_nom.values[0]
-            elif len(stor_p_nom) == 0:
-                stor_p_nom = 0.
-            else:
-                raise IndexError
 
-            storages.at[mv_grid, 'storage_p_nom'] = stor_p_nom
+        # eTraGo bus of each MV grid (one query for all MV grids)
+        bus_ids = self._get_bus_ids_of_mv_grids(session, all_mv_grids)
 
         Session.remove()
 
+        min_extended = 0.3
+        storage_units = self._etrago_network.storage_units
+        stor_p_nom = storage_units.loc[
+            (storage_units['p_nom_extendable'] == True)
+            & (storage_units['p_nom_opt'] > min_extended)
+            & (storage_units['max_hours'] <= 20.)
+        ].set_index('bus')['p_nom_opt']
+
+        mv_grid_buses = bus_ids.dropna().astype(int).astype(str)
+        stor_p_nom = stor_p_nom[stor_p_nom.index.isin(mv_grid_buses)]
+        if stor_p_nom.index.has_duplicates:
+            raise IndexError(
+                'More than one extended storage at eTraGo bus(es) {}'.format(
+                    stor_p_nom.index[
+                        stor_p_nom.index.duplicated()].unique().tolist()))
+
+        storages = pd.DataFrame(
+            {'storage_p_nom': mv_grid_buses.map(stor_p_nom)},
+            index=all_mv_grids).fillna(0.)
+
         return storages
 
     def _check_available_mv_grids(self):
@@ -694,14 +785,72 @@ class EDisGoNetworks:
             List of MV grid ID's
 
         """
-        mv_grids = []
-        for file in os.listdir(self._ding0_files):
-            if file.endswith('.pkl'):
-                mv_grids.append(
-                    int(file.replace(
-                        'ding0_grids__', ''
-                    ).replace('.pkl', '')))
+        return sorted(list_ding0_files(self._ding0_files))
+
+    def _order_by_grid_size(self, mv_grids):
+        """
+        Orders MV grids by their number of nodes, largest first, so that the
+        longest calculations are started first. The number of nodes is
+        taken from the ding0 grid summary. Grids without summary are started
+        last in the given order.
+
+        Parameters
+        ----------
+        mv_grids : :obj:`list`
+            List of MV grid ID's
 
+        Returns
+        -------
+        :obj:`list`
+            Ordered list of MV grid ID's
+
+        """
+        size = self._grid_sizes()
+        if size is None:
+            return mv_grids
+
+        return sorted(
+            mv_grids,
+            key=lambda mv_grid_id: -size.get(mv_grid_id, -1))
+
+    def _grid_sizes(self):
+        """
+        Returns
+        -------
+        None or :pandas:`pandas.Series<series>`
+            Number of nodes per MV grid from the ding0 grid summary. None if
+            there is no summary.
+        """
+        summary = load_grid_summary(self._ding0_files)
+        if summary is None:
+            return None
+        return summary['mv_nodes'] + summary['lv_nodes']
+
+    def _order_for_calculation(self, mv_grids):
+        """
+        Orders the MV grids to be calculated. With **anytime_tolerance**,
+        the MV grids are shuffled with **anytime_seed**, since the
+        progressive cost estimate takes the finished MV grids as a random
+        sample. Otherwise, parallel runs start the largest MV grids first
+        (see :meth:`_order_by_grid_size`).
+
+        Parameters
+        ----------
+        mv_grids : :obj:`list`
+            List of MV grid ID's
+
+        Returns
+        -------
+        :obj:`list`
+            Ordered list of MV grid ID's
+
+        """
+        if self._anytime_tolerance is not None:
+            order = np.random.RandomState(self._anytime_seed).permutation(
+                len(mv_grids))
+            return [mv_grids[i] for i in order]
+        if self._parallelization is True:
+            return self._order_by_grid_size(mv_grids)
         return mv_grids
 
     def _set_grid_choice(self):
@@ -718,9 +867,9 @@ class EDisGoNetworks:
 
         if self._choice_mode == 'cluster':
             no_grids = self._edisgo_args['no_grids']
-            logger.info('Clustering to {} MV grids'.format(no_grids))
 
-            cluster_df = self._cluster_mv_grids(no_grids)
+            with profiling.timer('eDisGo: Clustering'):
+                cluster_df = self._cluster_mv_grids(no_grids)
             choice_df[
                 'the_selected_network_id'
             ] = cluster_df['the_selected_network_id']
@@ -776,9 +925,37 @@ class EDisGoNetworks:
         if not os.path.exists(self._results):
             os.makedirs(self._results)
 
+        # The run's metadata is complete from the start, so that partial
+        # results can be analysed while the run is going
+        if not self._reuse_results:
+            # Results of previous runs must not be taken for this run's
+            edisgo_store.clear_status(self._results)
+            edisgo_store.remove_grids(
+                edisgo_store.store_path(self._results))
+        self._save_edisgo_results()
+        self._stored_grids = set()
+
+        self._tried_grids = set(self._selected_grids())
+
+        self._cost_estimate = _AnytimeCostEstimate(
+            self._grid_choice,
+            tolerance=self._anytime_tolerance,
+            min_grids=self._anytime_min_grids,
+            min_weight_share=self._anytime_min_weight_share,
+            grid_size=self._grid_sizes(),
+            no_strata=self._anytime_strata)
+
+        reused_grids = self._reuse_previous_results()
+        for mv_grid_id in reused_grids:
+            self._update_cost_estimate(
+                mv_grid_id, self._load_grid_expansion_costs(mv_grid_id))
+
         if parallelization is True:
             logger.info('Run eDisGo parallel')
-            mv_grids = self._grid_choice['the_selected_network_id'].tolist()
+            mv_grids = self._order_for_calculation([
+                mv_grid_id for mv_grid_id
+                in self._grid_choice['the_selected_network_id'].tolist()
+                if mv_grid_id not in reused_grids])
             no_cpu = mp2.cpu_count()
             if no_cpu > self._max_workers:
                 no_cpu = self._max_workers
@@ -787,49 +964,276 @@ class EDisGoNetworks:
                         self._max_workers
                     ))
 
-            self._edisgo_grids = set(mv_grids)
-            self._edisgo_grids = parallelizer(
+            self._edisgo_grids.update(parallelizer(
                 mv_grids,
                 lambda *xs: xs[1]._run_edisgo(xs[0]),
                 (self,),
                 self._max_calc_time,
-                workers=no_cpu)
+                workers=no_cpu,
+                progress_callback=self._grid_finished,
+                substitute=self._substitute_representative))
 
-            for g in mv_grids:
+            for g in self._selected_grids():
+                if g in reused_grids:
+                    continue
                 if not g in self._edisgo_grids:
                     self._edisgo_grids[g] = 'Timeout'
+                    edisgo_store.log_status(self._results, g, 'timeout')
+                elif profiling.is_enabled():
+                    self._collect_worker_timings(g)
 
         else:
             logger.info('Run eDisGo sequencial')
-            no_grids = len(self._grid_choice)
+            mv_grids = self._order_for_calculation([
+                int(mv_grid_id) for mv_grid_id
+                in self._grid_choice['the_selected_network_id'].tolist()])
+            no_grids = len(mv_grids)
             count = 0
-            for idx, row in self._grid_choice.iterrows():
+            for mv_grid_id in mv_grids:
                 prog = '%.1f' % (count / no_grids * 100)
                 logger.info(
                     '{} % Calculated by eDisGo'.format(prog)
                 )
 
-                mv_grid_id = int(row['the_selected_network_id'])
+                if mv_grid_id in reused_grids:
+                    count += 1
+                    continue
                 logger.info(
                     'MV grid {}'.format(mv_grid_id)
                 )
-                try:
-                    edisgo_grid = self._run_edisgo(mv_grid_id)
-                    self._edisgo_grids[
-                        mv_grid_id
-                    ] = edisgo_grid
-                except Exception as e:
-                    self._edisgo_grids[mv_grid_id] = e
-                    logger.exception(
-                        'MV grid {} failed: \n'.format(mv_grid_id)
-                    )
+                while mv_grid_id is not None:
+                    try:
+                        result = self._run_edisgo(mv_grid_id)
+                        self._edisgo_grids.update(result)
+                    except Exception as e:
+                        self._edisgo_grids[mv_grid_id] = e
+                        logger.exception(
+                            'MV grid {} failed: \n'.format(mv_grid_id)
+                        )
+                        mv_grid_id = self._substitute_representative(
+                            mv_grid_id)
+                    else:
+                        break
+                if mv_grid_id is not None:
+                    if self._grid_finished(mv_grid_id, result):
+                        break
                 count += 1
 
+            for g in self._selected_grids():
+                if not g in self._edisgo_grids:
+                    self._edisgo_grids[g] = 'Not calculated'
+                    edisgo_store.log_status(self._results, g, 'skipped')
+
+        # Failed representatives that were substituted are dropped
+        selected_grids = self._selected_grids()
+        self._edisgo_grids = {
+            mv_grid_id: edisgo_grid
+            for mv_grid_id, edisgo_grid in self._edisgo_grids.items()
+            if mv_grid_id in selected_grids}
+
         self._csv_import = self._json_file['eDisGo']['results']
         self._save_edisgo_results()
-        self._laod_edisgo_results()
+        self._import_result_bundles(reused_grids)
         self._run_finished = True
 
+    def _selected_grids(self):
+        """
+        Returns
+        -------
+        :obj:`list`
+            MV grid ID's of the current representatives
+        """
+        return self._grid_choice['the_selected_network_id'].astype(
+            int).tolist()
+
+    def _substitute_representative(self, mv_grid_id):
+        """
+        Substitutes a failed representative MV grid by the next member of
+        its cluster that has not been tried yet. The members are ranked by
+        their distance to the cluster center. The grid choice is updated,
+        so that the substitute takes over the cluster's weighting.
+
+        Parameters
+        ----------
+        mv_grid_id : int
+            MV grid ID of the failed representative
+
+        Returns
+        -------
+        None or int
+            MV grid ID of the substitute. None if there is no substitute
+            (e.g. in case of **choice_mode** = ``''manual''``)
+
+        """
+        cluster = self._grid_choice.index[
+            self._grid_choice['the_selected_network_id'] == mv_grid_id]
+        if len(cluster) == 0:
+            edisgo_store.log_status(self._results, mv_grid_id, 'failed')
+            return None
+        cluster = cluster[0]
+
+        self._tried_grids.add(mv_grid_id)
+        substitute_id = self._next_cluster_member(cluster)
+
+        if substitute_id is None:
+            edisgo_store.log_status(
+                self._results, mv_grid_id, 'failed', 'No substitute left')
+            logger.warning(
+                'No substitute left for failed MV grid {}'.format(mv_grid_id))
+            return None
+
+        self._grid_choice.at[
+            cluster, 'the_selected_network_id'] = substitute_id
+        self._save_edisgo_results()
+        edisgo_store.log_status(
+            self._results, mv_grid_id, 'failed',
+            'Substituted by {}'.format(substitute_id))
+        self._status_update(
+            mv_grid_id, 'end',
+            message='Failed, substituted by {}'.format(substitute_id),
+            show=False)
+        logger.info(
+            'MV grid {} failed and is substituted by MV grid {}'.format(
+                mv_grid_id, substitute_id))
+        return substitute_id
+
+    def _next_cluster_member(self, cluster):
+        """
+        Returns
+        -------
+        None or int
+            MV grid ID of the next available cluster member that has not
+            been tried yet. It is marked as tried.
+        """
+        available_grids = self._check_available_mv_grids()
+        for substitute_id in self._grid_choice.at[
+                cluster, 'represented_grids']:
+            if (substitute_id in self._tried_grids
+                    or substitute_id not in available_grids):
+                continue
+
+            self._tried_grids.add(substitute_id)
+            return substitute_id
+
+        return None
+
+    def _grid_finished(self, mv_grid_id, result):
+        """
+        Commits the results of a finished MV grid to the result store and
+        its commit log, and adds them to the progressive cost estimate.
+        Errors while writing the results are logged, the run goes on.
+
+        Parameters
+        ----------
+        mv_grid_id : int
+            MV grid ID
+        result : :obj:`dict`
+            Result bundle, keyed by the MV grid ID (see :meth:`_run_edisgo`)
+
+        Returns
+        -------
+        bool
+            ``True`` if the remaining MV grids need not be calculated, see
+            :meth:`_update_cost_estimate`
+
+        """
+        bundle = result[mv_grid_id]
+        try:
+            edisgo_store.write_grid(
+                edisgo_store.store_path(self._results), mv_grid_id, bundle)
+            edisgo_store.log_status(self._results, mv_grid_id, 'finished')
+            self._stored_grids.add(mv_grid_id)
+        except Exception as e:
+            # The results are still available in memory
+            logger.exception(
+                'Results of MV grid {} could not be stored'.format(
+                    mv_grid_id))
+            try:
+                edisgo_store.log_status(
+                    self._results, mv_grid_id, 'not_stored', repr(e))
+            except Exception:
+                pass
+
+        return self._update_cost_estimate(
+            mv_grid_id, bundle['grid_expansion_costs'])
+
+    def _update_cost_estimate(self, mv_grid_id, grid_expansion_costs):
+        """
+        Adds a finished MV grid to the progressive cost estimate and writes
+        all estimates to ``cost_estimates.csv`` in the results folder
+
+        Parameters
+        ----------
+        mv_grid_id : int
+            MV grid ID
+        grid_expansion_costs : None or :pandas:`pandas.DataFrame<dataframe>`
+            Grid expansion costs of this MV grid
+
+        Returns
+        -------
+        bool
+            ``True`` if the estimate is stable (see **anytime_tolerance**),
+            i.e. the remaining MV grids need not be calculated
+
+        """
+        self._cost_estimate.add(mv_grid_id, grid_expansion_costs)
+
+        total = self._cost_estimate.estimate().loc['total']
+        logger.info(
+            'Estimated MV/LV grid expansion costs: {:,.0f} EUR '
+            '({:,.0f} - {:,.0f} EUR)'.format(
+                total['overnight_costs'], total['lower'], total['upper']))
+
+        self._cost_estimate.history.to_csv(
+            os.path.join(self._results, 'cost_estimates.csv'), index=False)
+
+        stable = self._cost_estimate.is_stable()
+        if stable:
+            logger.info(
+                'Cost estimate is stable within {:.1%}. Remaining MV grids '
+                'are not calculated'.format(self._anytime_tolerance))
+
+        return stable
+
+    def _reuse_previous_results(self):
+        """
+        Identifies the chosen MV grids that were already calculated in a
+        previous run with the same results folder (only if
+        **reuse_results** is ``true``). These MV grids are not calculated
+        again, their results are imported from the results folder.
+
+        Returns
+        -------
+        :obj:`list`
+            List of reused MV grid ID's
+
+        """
+        if not self._reuse_results:
+            return []
+
+        stored_grids = edisgo_store.stored_grids(
+            edisgo_store.store_path(self._results))
+
+        reused_grids = []
+        for mv_grid_id in self._grid_choice['the_selected_network_id']:
+            mv_grid_id = int(mv_grid_id)
+            path = os.path.join(self._results, str(mv_grid_id))
+            if mv_grid_id in stored_grids or os.path.isfile(os.path.join(
+                    path,
+                    'grid_expansion_results',
+                    'grid_expansion_costs.csv')):
+                reused_grids.append(mv_grid_id)
+                self._edisgo_grids[mv_grid_id] = path
+                edisgo_store.log_status(self._results, mv_grid_id, 'reused')
+                self._status_update(
+                    mv_grid_id, 'end', message='Reused', show=False)
+
+        logger.info(
+            'Reusing results of {} of {} MV grids from {}'.format(
+                len(reused_grids), len(self._grid_choice), self._results))
+
+        return reused_grids
+
     def _run_edisgo(
             self,
             mv_grid_id):
@@ -843,10 +1247,13 @@ class EDisGoNetworks:
 
         Returns
         -------
-        :class:`edisgo.grid.network.EDisGo`
-            Returns the complete eDisGo container, also including results
+        :obj:`dict`
+            Result bundle (see :func:`_result_bundle`), keyed by the MV grid
+            ID
         """
         self._status_update(mv_grid_id, 'start', show=False)
+        t0 = perf_counter()
+        timings_mark = profiling.mark()
 
         storage_integration = self._storage_distribution
         apply_curtailment = self._apply_curtailment
@@ -873,6 +1280,9 @@ class EDisGoNetworks:
             self._max_cos_phi_renewable)
         Session.remove()
 
+        t1 = perf_counter()
+        profiling.record('eDisGo: Interface values', t1-t0, mv_grid_id)
+
         # Get ding0 (MV grid) form folder
         ding0_filepath = (
             self._ding0_files
@@ -912,6 +1322,10 @@ class EDisGoNetworks:
 
         edisgo_grid.reinforce()
 
+        t2 = perf_counter()
+        profiling.record(
+            'eDisGo: Initial reinforcement', t2-t1, mv_grid_id)
+
         # Get costs for initial reinforcement
         # TODO: Implement a separate cost function
         costs_grouped = \
@@ -984,7 +1398,12 @@ class EDisGoNetworks:
                 timeseries_load='demandlib',
                 timeindex=specs['conv_dispatch'].index).timeseries
 
+        t3 = perf_counter()
+        profiling.record(
+            'eDisGo: Generators and time series', t3-t2, mv_grid_id)
+
         # Curtailment
+        curt_abs = None
         if apply_curtailment:
             logger.info('Including Curtailment')
 
@@ -1018,6 +1437,9 @@ class EDisGoNetworks:
         else:
             logger.info('No curtailment applied')
 
+        t4 = perf_counter()
+        profiling.record('eDisGo: Curtailment', t4-t3, mv_grid_id)
+
         # Storage Integration
         costs_without_storage = None
         if storage_integration:
@@ -1036,9 +1458,27 @@ class EDisGoNetworks:
         else:
             logger.info('No storage integration')
 
+        t5 = perf_counter()
+        profiling.record('eDisGo: Storage integration', t5-t4, mv_grid_id)
+
         logger.info("MV grid {}: eDisGo grid analysis".format(mv_grid_id))
 
-        edisgo_grid.reinforce(timesteps_pfa=self._timesteps_pfa)
+        if self._timesteps_pfa == 'critical_timesteps':
+            timesteps_pfa = get_critical_timesteps(
+                edisgo_grid.network.timeseries.timesteps_load_feedin_case[
+                    'residual_load'],
+                self._no_critical_timesteps,
+                battery_p_series=(
+                    specs['battery_p_series'] if storage_integration
+                    and self._ext_storage else None),
+                curtailment=curt_abs)
+            logger.info(
+                "MV grid {}: Power flow analysis for {} critical "
+                "timesteps".format(mv_grid_id, len(timesteps_pfa)))
+        else:
+            timesteps_pfa = self._timesteps_pfa
+
+        edisgo_grid.reinforce(timesteps_pfa=timesteps_pfa)
 
         if costs_without_storage is not None:
             costs_with_storage = (
@@ -1053,117 +1493,270 @@ class EDisGoNetworks:
                 for storage in st:
                     tools.disconnect_storage(edisgo_grid.network, storage)
 
-        self._status_update(mv_grid_id, 'end')
+        t6 = perf_counter()
+        profiling.record('eDisGo: Reinforcement', t6-t5, mv_grid_id)
 
-        path = os.path.join(self._results, str(mv_grid_id))
-        edisgo_grid.network.results.save(path)
+        self._status_update(mv_grid_id, 'end')
 
-        return {edisgo_grid.network.id: path}
+        bundle = _result_bundle(edisgo_grid)
+
+        t7 = perf_counter()
+        profiling.record('eDisGo: Result bundle', t7-t6, mv_grid_id)
+        profiling.record('eDisGo: Overall time', t7-t0, mv_grid_id)
+        if (profiling.is_enabled()
+                and mp2.current_process().name != 'MainProcess'):
+            # Worker processes hand their timings over to eGo by file. All
+            # timings of this grid are handed over, including those of the
+            # specs, which are recorded per eTraGo bus. In a sequential run
+            # they are already in eGo's registry.
+            path = os.path.join(self._results, str(mv_grid_id))
+            if not os.path.exists(path):
+                os.makedirs(path)
+            profiling.get_timings(since=timings_mark).to_csv(
+                os.path.join(path, 'performance.csv'), index=False)
+
+        return {edisgo_grid.network.id: bundle}
+
+    def _collect_worker_timings(self, mv_grid_id):
+        """
+        Adds the timings of a MV grid that was calculated in a worker process
+        """
+        timings_path = os.path.join(
+            self._results, str(mv_grid_id), 'performance.csv')
+        if os.path.isfile(timings_path):
+            profiling.add_timings(pd.read_csv(timings_path))
 
     def _save_edisgo_results(self):
-
+        """
+        Saves the metadata of the run (eDisGo settings, grid choice and
+        cluster diagnostics) to the results folder. Each file is replaced
+        at once, so that readers never see a partially written file.
+        """
         if not os.path.exists(self._results):
             os.makedirs(self._results)
 
-        with open(
-                os.path.join(self._results, 'edisgo_args.json'),
-                'w') as fp:
-            json.dump(self._edisgo_args, fp)
+        def replace(file, write):
+            path = os.path.join(self._results, file)
+            write(path + '.tmp')
+            os.replace(path + '.tmp', path)
 
-        self._grid_choice.to_csv(self._results + '/grid_choice.csv')
+        def write_args(path):
+            with open(path, 'w') as fp:
+                json.dump(self._edisgo_args, fp)
 
-    def _laod_edisgo_results(self):
+        replace('edisgo_args.json', write_args)
+        write_grid_choice(self._grid_choice, self._results)
+        if self._cluster_diagnostics is not None:
+            replace('cluster_diagnostics.csv',
+                    self._cluster_diagnostics.to_csv)
 
-        # Load the grid choice form CSV
-        self._grid_choice = pd.read_csv(
-            os.path.join(self._csv_import, 'grid_choice.csv'),
-            index_col=0)
-        self._grid_choice['represented_grids'] = self._grid_choice.apply(
-            lambda x: eval(x['represented_grids']), axis=1)
+    def _import_result_bundles(self, reused_grids):
+        """
+        Replaces the result bundles returned by the eDisGo runs of this run
+        by imported eDisGo grids. The light results (grid expansion costs,
+        storages and configs) are taken from the bundles. Grid topologies
+        and apparent powers of grids in the result store are released and
+        loaded from the store on demand. Reused grids are imported from the
+        results folder. Failed grids are not imported.
 
-        for idx, row in self._grid_choice.iterrows():
-            mv_grid_id = int(row['the_selected_network_id'])
+        Parameters
+        ----------
+        reused_grids : :obj:`list`
+            MV grid ID's reused from a previous run
 
-            try:
-                # Grid expansion costs
-                file_path = os.path.join(
-                    self._csv_import,
-                    str(mv_grid_id),
-                    'grid_expansion_results',
-                    'grid_expansion_costs.csv')
+        """
+        for mv_grid_id in self._selected_grids():
+            bundle = self._edisgo_grids.get(mv_grid_id)
+            if isinstance(bundle, dict):
+                self._edisgo_grids[mv_grid_id] = self._import_bundle(
+                    mv_grid_id, bundle)
 
-                grid_expansion_costs = pd.read_csv(
-                    file_path,
-                    index_col=0)
+        self._import_edisgo_grids([
+            mv_grid_id for mv_grid_id in self._selected_grids()
+            if mv_grid_id in reused_grids])
 
-                # powerflow results
-                pf_path = os.path.join(
-                    self._csv_import,
-                    str(mv_grid_id),
-                    'powerflow_results',
-                    'apparent_powers.csv')
+    def _import_bundle(self, mv_grid_id, bundle):
+        """
+        Imports the result bundle of an MV grid of this run
 
-                s_res = pd.read_csv(
-                    pf_path,
-                    index_col=0,
-                    parse_dates=True)
+        Parameters
+        ----------
+        mv_grid_id : int
+            MV grid ID
+        bundle : :obj:`dict`
+            Result bundle, see :func:`_result_bundle`
 
-                # Configs
-                config_path = os.path.join(
-                    self._csv_import,
-                    str(mv_grid_id),
-                    'configs.csv')
-
-                edisgo_config = {}
-                with open(config_path, 'r') as f:
-                    reader = csv.reader(f)
-                    for row in reader:
-                        a = iter(row[1:])
-                        edisgo_config[row[0]] = dict(zip(a, a))
-
-                # PyPSA network
-                pypsa_path = os.path.join(
-                    self._csv_import,
-                    str(mv_grid_id),
-                    'pypsa_network')
+        Returns
+        -------
+        :class:`_EDisGoImported`
+            Imported (reduced) eDisGo grid
 
-                imported_pypsa = pypsa.Network()
-                imported_pypsa.import_from_csv_folder(pypsa_path)
+        """
+        parts = {
+            part: bundle[part] for part in
+            ['grid_expansion_costs', 'storages', 'edisgo_config']}
+        if mv_grid_id not in self._stored_grids:
+            # Heavy results are kept, as they cannot be reloaded
+            parts.update(pypsa=bundle['pypsa'], s_res=bundle['s_res'])
 
-                # Storages
-                storage_path = os.path.join(
-                    self._csv_import,
-                    str(mv_grid_id),
-                    'storage_integration_results',
-                    'storages.csv')
-
-                if os.path.exists(storage_path):
-                    storages = pd.read_csv(
-                        storage_path,
-                        index_col=0)
-                else:
-                    storages = pd.DataFrame(
-                        columns=['nominal_power', 'voltage_level'])
+        path = edisgo_store.store_path(self._results)
 
-                edisgo_grid = _EDisGoImported(
-                    grid_expansion_costs,
-                    s_res,
-                    storages,
-                    imported_pypsa,
-                    edisgo_config)
+        def load(part):
+            if part in parts:
+                return parts[part]
+            return edisgo_store.read_part(path, mv_grid_id, part)
 
-                self._edisgo_grids[
-                    mv_grid_id
-                ] = edisgo_grid
+        return _EDisGoImported(load, self._result_cache, mv_grid_id)
+
+    def _laod_edisgo_results(self):
+
+        # Load the grid choice form CSV
+        self._grid_choice = read_grid_choice(
+            os.path.join(self._csv_import, 'grid_choice.csv'))
+
+        mv_grids = self._grid_choice['the_selected_network_id'].astype(
+            int).tolist()
+
+        # Only grids that finished in the imported run, if it was logged
+        status = edisgo_store.read_status(self._csv_import)['status']
+        if not status.empty:
+            for mv_grid_id in mv_grids:
+                if status.get(mv_grid_id) not in ['finished', 'reused']:
+                    self._edisgo_grids[mv_grid_id] = (
+                        'Not finished ({})'.format(
+                            status.get(mv_grid_id, 'not started')))
+            mv_grids = [
+                mv_grid_id for mv_grid_id in mv_grids
+                if mv_grid_id not in self._edisgo_grids]
+
+        self._import_edisgo_grids(mv_grids)
+
+    def _import_edisgo_grids(self, mv_grids):
+        """
+        Imports the saved results of several MV grids in parallel threads
+
+        The light results (grid expansion costs, storages and configs) of
+        all MV grids are loaded right away. Grids whose results cannot be
+        loaded are marked as failed, the reason is logged.
+
+        Parameters
+        ----------
+        mv_grids : :obj:`list`
+            MV grid ID's
 
+        """
+        with ThreadPoolExecutor(
+                max_workers=max(min(self._max_workers, len(mv_grids)), 1)
+        ) as executor:
+            imported = list(executor.map(self._import_edisgo_grid, mv_grids))
+
+        for mv_grid_id, (edisgo_grid, error) in zip(mv_grids, imported):
+            if error is None:
+                self._edisgo_grids[mv_grid_id] = edisgo_grid
                 logger.info("Imported MV grid {}".format(mv_grid_id))
-            except:
+            else:
                 self._edisgo_grids[
                     mv_grid_id
                 ] = "This grid failed to reimport"
 
                 logger.warning(
-                    "MV grid {} could not be loaded".format(mv_grid_id))
+                    "MV grid {} could not be loaded: {!r}".format(
+                        mv_grid_id, error))
+
+    def _import_edisgo_grid(self, mv_grid_id):
+        """
+        Imports the saved results of a single MV grid and loads its light
+        results
+
+        Parameters
+        ----------
+        mv_grid_id : int
+            MV grid ID
+
+        Returns
+        -------
+        :obj:`tuple`
+            Imported grid (None in case of an error) and the error (None if
+            the import succeeded)
+
+        """
+        try:
+            edisgo_grid = self._load_edisgo_grid(mv_grid_id)
+            edisgo_grid.network.results.grid_expansion_costs
+            edisgo_grid.network.results.storages
+            edisgo_grid.network.config
+        except Exception as e:
+            return None, e
+
+        return edisgo_grid, None
+
+    def _load_grid_expansion_costs(self, mv_grid_id):
+        """
+        Loads the grid expansion costs of a single MV grid from the results
+        folder
+
+        Parameters
+        ----------
+        mv_grid_id : int
+            MV grid ID
+
+        Returns
+        -------
+        :pandas:`pandas.DataFrame<dataframe>`
+            Grid expansion costs
+
+        """
+        path = edisgo_store.store_path(self._results)
+        if edisgo_store.has_grid(path, mv_grid_id):
+            return edisgo_store.read_part(
+                path, mv_grid_id, 'grid_expansion_costs')
+
+        return pd.read_csv(
+            os.path.join(
+                self._results,
+                str(mv_grid_id),
+                'grid_expansion_results',
+                'grid_expansion_costs.csv'),
+            index_col=0)
+
+    def _load_edisgo_grid(self, mv_grid_id):
+        """
+        Imports the saved results of a single MV grid
+
+        The results are read from the result store
+        (:mod:`ego.tools.edisgo_store`). Results of runs without result
+        store are read from their CSV files. Each result is only loaded when
+        it is accessed for the first time. Grid topologies and apparent
+        powers are kept in a cache of limited size
+        (**max_cached_results**), all other results are kept.
+
+        Parameters
+        ----------
+        mv_grid_id : int
+            MV grid ID
+
+        Returns
+        -------
+        :class:`_EDisGoImported`
+            Imported (reduced) eDisGo grid
+
+        """
+        path = edisgo_store.store_path(self._csv_import)
+        if edisgo_store.has_grid(path, mv_grid_id):
+            def load(part):
+                return edisgo_store.read_part(path, mv_grid_id, part)
+        else:
+            results = self._csv_import
+            if not os.path.isfile(os.path.join(
+                    results, str(mv_grid_id), 'configs.csv')):
+                raise FileNotFoundError(
+                    'No results of MV grid {} in {}'.format(
+                        mv_grid_id, results))
+
+            def load(part):
+                return _read_csv_result(results, mv_grid_id, part)
+
+        return _EDisGoImported(load, self._result_cache, mv_grid_id)
 
     def _get_mv_grid_from_bus_id(self, session, bus_id):
         """
@@ -1204,6 +1797,49 @@ class EDisGoNetworks:
 
         return subst_id
 
+    def _get_bus_ids_of_mv_grids(self, session, subst_ids):
+        """
+        Queries the eTraGo bus IDs for several MV grid (ding0) IDs at once
+
+        Parameters
+        ----------
+        subst_ids : :obj:`list`
+            MV grid (ding0) IDs
+
+        Returns
+        -------
+        :pandas:`pandas.Series<series>`
+            eTraGo bus ID of each MV grid (index). NaN if no bus is found.
+
+        """
+
+        if self._versioned is True:
+            ormclass_hvmv_subst = grid.__getattribute__(
+                'EgoDpHvmvSubstation'
+            )
+            query = session.query(
+                ormclass_hvmv_subst.subst_id,
+                ormclass_hvmv_subst.otg_id
+            ).filter(
+                ormclass_hvmv_subst.version == self._grid_version
+            )
+
+        if self._versioned is False:
+            ormclass_hvmv_subst = model_draft.__getattribute__(
+                'EgoGridHvmvSubstation'
+            )
+            query = session.query(
+                ormclass_hvmv_subst.subst_id,
+                ormclass_hvmv_subst.otg_id
+            )
+
+        bus_ids = pd.DataFrame(
+            query.all(),
+            columns=['subst_id', 'otg_id']
+        ).drop_duplicates('subst_id').set_index('subst_id')['otg_id']
+
+        return bus_ids.reindex(subst_ids)
+
     def _get_bus_id_from_mv_grid(self, session, subst_id):
         """
         Queries the eTraGo bus ID for given MV grid (ding0) ID
@@ -1244,6 +1880,65 @@ class EDisGoNetworks:
         return bus_id
 
 
+def _result_bundle(edisgo_grid):
+    """
+    Reduces the results of an eDisGo run to the data used in eGo
+
+    The bundle only contains plain pandas and python objects, so that it
+    can be returned cheaply from a worker process. Equipment objects are
+    replaced by their string representation, as in the saved CSV files.
+
+    Parameters
+    ----------
+    edisgo_grid : :class:`edisgo.grid.network.EDisGo`
+        eDisGo grid including its results
+
+    Returns
+    -------
+    :obj:`dict`
+        Keyword arguments of :class:`_EDisGoImported`: grid expansion
+        costs, apparent powers (``s_res``), storages, static dataframes
+        of the PyPSA buses, lines and storage units (``pypsa``) and the
+        configs
+
+    """
+    def plain(df):
+        df = df.copy()
+        df.index = df.index.map(str)
+        for col in df.columns[df.dtypes == object]:
+            df[col] = df[col].map(
+                lambda x: x if x is None or isinstance(x, (str, int, float))
+                else str(x))
+        return df
+
+    results = edisgo_grid.network.results
+
+    storages = plain(results.storages)
+    if storages.empty:
+        storages = pd.DataFrame(columns=['nominal_power', 'voltage_level'])
+
+    # Only the components of :class:`_GridTopology`, buses first, as the
+    # other components refer to them
+    components = {}
+    if edisgo_grid.network.pypsa is not None:
+        for name, list_name in [('Bus', 'buses'), ('Line', 'lines'),
+                                ('StorageUnit', 'storage_units')]:
+            components[name] = plain(
+                getattr(edisgo_grid.network.pypsa, list_name))
+
+    # Configs as in the saved configs.csv
+    config = {
+        section: {str(key): str(value) for key, value in values.items()}
+        for section, values in edisgo_grid.network.config._data.items()}
+
+    return {
+        'grid_expansion_costs': plain(results.grid_expansion_costs),
+        's_res': results.s_res(),
+        'storages': storages,
+        'pypsa': components,
+        'edisgo_config': config}
+
+
 class _ETraGoData:
     """
     Container for minimal eTraGo network. This minimal network is required
@@ -1265,26 +1960,176 @@ class _ETraGoData:
             etrago_network, "generators_t")
 
 
+def _read_csv_result(results, mv_grid_id, part):
+    """
+    Reads a single result of an MV grid from the CSV files of a results
+    folder (results of runs without result store)
+
+    Parameters
+    ----------
+    results : :obj:`str`
+        Path to the eDisGo results folder
+    mv_grid_id : int
+        MV grid ID
+    part : :obj:`str`
+        ``'grid_expansion_costs'``, ``'s_res'``, ``'storages'``, ``'pypsa'``
+        or ``'edisgo_config'``
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<dataframe>` or :obj:`dict`
+        Result. PyPSA components are returned as static dataframes, keyed
+        by the component name.
+
+    """
+    path = os.path.join(results, str(mv_grid_id))
+
+    if part == 'grid_expansion_costs':
+        return pd.read_csv(
+            os.path.join(
+                path,
+                'grid_expansion_results',
+                'grid_expansion_costs.csv'),
+            index_col=0)
+
+    elif part == 's_res':
+        return pd.read_csv(
+            os.path.join(
+                path,
+                'powerflow_results',
+                'apparent_powers.csv'),
+            index_col=0,
+            parse_dates=True)
+
+    elif part == 'edisgo_config':
+        edisgo_config = {}
+        with open(os.path.join(path, 'configs.csv'), 'r') as f:
+            reader = csv.reader(f)
+            for row in reader:
+                a = iter(row[1:])
+                edisgo_config[row[0]] = dict(zip(a, a))
+        return edisgo_config
+
+    elif part == 'pypsa':
+        # Only the components used in eGo
+        components = {}
+        for name, file in [('Bus', 'buses.csv'),
+                           ('Line', 'lines.csv'),
+                           ('StorageUnit', 'storage_units.csv')]:
+            file = os.path.join(path, 'pypsa_network', file)
+            if os.path.isfile(file):
+                components[name] = pd.read_csv(file, index_col=0)
+        return components
+
+    elif part == 'storages':
+        storage_path = os.path.join(
+            path,
+            'storage_integration_results',
+            'storages.csv')
+
+        if os.path.exists(storage_path):
+            return pd.read_csv(
+                storage_path,
+                index_col=0)
+        else:
+            return pd.DataFrame(
+                columns=['nominal_power', 'voltage_level'])
+
+    raise KeyError('Unknown eDisGo result {}'.format(part))
+
+
+class _LRUCache:
+    """
+    Cache of limited size, the least recently used entry is dropped first
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of entries
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def get(self, key, load):
+        """
+        Returns the cached value of key. If key is not cached, the value is
+        loaded by calling load() and cached.
+        """
+        if key in self._data:
+            self._data.move_to_end(key)
+            return self._data[key]
+
+        value = load()
+        self._data[key] = value
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+        return value
+
+    def __len__(self):
+        return len(self._data)
+
+
 class _EDisGoImported:
     """
     Imported (reduced) eDisGo class.
     This class allows the import reduction to only the attributes used in eGo
+
+    All results are loaded on first access. Light results (grid expansion
+    costs, storages and configs) are kept, heavy results (grid topology and
+    apparent powers) are kept in a shared cache of limited size.
+
+    Parameters
+    ----------
+    load : function
+        Loads a result, called with the name of the result
+        (``'grid_expansion_costs'``, ``'s_res'``, ``'storages'``,
+        ``'pypsa'`` or ``'edisgo_config'``)
+    cache : None or :class:`_LRUCache`
+        Cache for heavy results. If None, heavy results are kept as well.
+    mv_grid_id : None or int
+        MV grid ID, part of the cache keys
     """
 
     def __init__(
             self,
-            grid_expansion_costs,
-            s_res,
-            storages,
-            pypsa,
-            edisgo_config):
+            load,
+            cache=None,
+            mv_grid_id=None):
+
+        self.network = _NetworkImported(_ResultLoader(load, cache, mv_grid_id))
+
+
+class _ResultLoader:
+    """
+    Loads the results of an imported eDisGo grid on first access
+    """
+
+    heavy = ['pypsa', 's_res']
+
+    def __init__(self, load, cache, mv_grid_id):
+        self._load = load
+        self._cache = cache
+        self._mv_grid_id = mv_grid_id
+        self._loaded = {}
 
-        self.network = _NetworkImported(
-            grid_expansion_costs,
-            s_res,
-            storages,
-            pypsa,
-            edisgo_config)
+    def __call__(self, part):
+        if part in self.heavy and self._cache is not None:
+            return self._cache.get(
+                (self._mv_grid_id, part),
+                lambda: self._load_part(part))
+
+        if part not in self._loaded:
+            self._loaded[part] = self._load_part(part)
+        return self._loaded[part]
+
+    def _load_part(self, part):
+        value = self._load(part)
+        if part == 'pypsa':
+            value = _GridTopology.from_components(value)
+        return value
 
 
 class _NetworkImported:
@@ -1294,19 +2139,160 @@ class _NetworkImported:
 
     def __init__(
             self,
-            grid_expansion_costs,
-            s_res,
-            storages,
-            pypsa,
-            edisgo_config):
+            load):
+
+        self._load = load
+        self.results = _ResultsImported(load)
+
+    @property
+    def pypsa(self):
+        """
+        :class:`_GridTopology`: Buses, lines and storage units of the MV
+        grid. Use :meth:`_GridTopology.to_pypsa` for a PyPSA network.
+        """
+        return self._load('pypsa')
+
+    @property
+    def config(self):
+        return self._load('edisgo_config')
+
+
+class _GridTopology:
+    """
+    Compact topology of an imported MV grid
+
+    Only the buses, lines and storage units used in eGo are kept. Bus
+    references of lines and storage units are stored as integer codes of
+    the bus, coordinates as 32 bit floats. The properties :attr:`buses`,
+    :attr:`lines` and :attr:`storage_units` return dataframes as in
+    :class:`pypsa.Network`, :meth:`to_pypsa` builds a PyPSA network.
 
-        self.results = _ResultsImported(
-            grid_expansion_costs,
-            s_res,
-            storages)
+    Parameters
+    ----------
+    buses : :pandas:`pandas.DataFrame<dataframe>`
+        Buses with columns x, y and v_nom
+    lines : :pandas:`pandas.DataFrame<dataframe>`
+        Lines with columns bus0, bus1 and the parameters in
+        :attr:`line_attributes`
+    storage_units : :pandas:`pandas.DataFrame<dataframe>`
+        Storage units with column bus and the parameters in
+        :attr:`storage_attributes`
+    """
 
-        self.pypsa = pypsa
-        self.config = edisgo_config
+    __slots__ = ['_bus_ids', '_bus_x', '_bus_y', '_bus_v_nom',
+                 '_line_ids', '_line_bus0', '_line_bus1', '_line_data',
+                 '_storage_ids', '_storage_bus', '_storage_data']
+
+    # Parameters kept and their PyPSA defaults
+    line_attributes = OrderedDict([
+        ('v_nom', np.nan), ('x', 0.), ('r', 0.), ('s_nom', 0.),
+        ('length', 0.), ('num_parallel', 1.)])
+    storage_attributes = OrderedDict([
+        ('p_nom', 0.), ('max_hours', 1.)])
+
+    def __init__(self, buses, lines, storage_units):
+        bus_ids = pd.Index(buses.index.map(str))
+        self._bus_ids = bus_ids.values
+        self._bus_x = self._column(buses, 'x', 0., np.float32)
+        self._bus_y = self._column(buses, 'y', 0., np.float32)
+        self._bus_v_nom = self._column(buses, 'v_nom', 1., np.float32)
+
+        self._line_ids = lines.index.map(str).values
+        self._line_bus0 = self._bus_codes(bus_ids, lines['bus0'])
+        self._line_bus1 = self._bus_codes(bus_ids, lines['bus1'])
+        self._line_data = OrderedDict(
+            (attr, self._column(lines, attr, default))
+            for attr, default in self.line_attributes.items())
+        # Lines of eDisGo's PyPSA export may lack their nominal voltage
+        missing = np.isnan(self._line_data['v_nom'])
+        self._line_data['v_nom'][missing] = self._bus_v_nom[
+            self._line_bus0[missing]]
+
+        self._storage_ids = storage_units.index.map(str).values
+        self._storage_bus = self._bus_codes(bus_ids, storage_units['bus'])
+        self._storage_data = OrderedDict(
+            (attr, self._column(storage_units, attr, default))
+            for attr, default in self.storage_attributes.items())
+
+    @classmethod
+    def from_components(cls, components):
+        """
+        Builds the topology from static component dataframes
+
+        Parameters
+        ----------
+        components : :obj:`dict`
+            Static dataframes, keyed by the PyPSA component name (e.g.
+            ``'Bus'``)
+
+        Returns
+        -------
+        :class:`_GridTopology`
+
+        """
+        return cls(
+            components.get('Bus', pd.DataFrame()),
+            components.get(
+                'Line', pd.DataFrame(columns=['bus0', 'bus1'])),
+            components.get(
+                'StorageUnit', pd.DataFrame(columns=['bus'])))
+
+    @staticmethod
+    def _column(df, attr, default, dtype=np.float64):
+        if attr in df.columns:
+            return df[attr].fillna(default).values.astype(dtype)
+        return np.full(len(df), default, dtype=dtype)
+
+    @staticmethod
+    def _bus_codes(bus_ids, buses):
+        codes = bus_ids.get_indexer(buses.map(str))
+        if (codes < 0).any():
+            raise KeyError('Unknown buses {}'.format(
+                list(buses[codes < 0].unique())))
+        return codes.astype(np.int32)
+
+    @property
+    def buses(self):
+        return pd.DataFrame(
+            OrderedDict([('x', self._bus_x),
+                         ('y', self._bus_y),
+                         ('v_nom', self._bus_v_nom)]),
+            index=pd.Index(self._bus_ids, name='name'))
+
+    @property
+    def lines(self):
+        return pd.DataFrame(
+            OrderedDict(
+                [('bus0', self._bus_ids[self._line_bus0]),
+                 ('bus1', self._bus_ids[self._line_bus1])] +
+                list(self._line_data.items())),
+            index=pd.Index(self._line_ids, name='name'))
+
+    @property
+    def storage_units(self):
+        return pd.DataFrame(
+            OrderedDict(
+                [('bus', self._bus_ids[self._storage_bus])] +
+                list(self._storage_data.items())),
+            index=pd.Index(self._storage_ids, name='name'))
+
+    def to_pypsa(self):
+        """
+        Builds a PyPSA network of the topology
+
+        Returns
+        -------
+        :class:`pypsa.Network`
+            PyPSA network without time series
+
+        """
+        network = pypsa.Network()
+        network.import_components_from_dataframe(self.buses, 'Bus')
+        network.import_components_from_dataframe(self.lines, 'Line')
+        network.import_components_from_dataframe(
+            self.storage_units, 'StorageUnit')
+
+        return network
 
 
 class _ResultsImported:
@@ -1316,16 +2302,226 @@ class _ResultsImported:
 
     def __init__(
             self,
-            grid_expansion_costs,
-            s_res,
-            storages):
+            load):
 
-        self.grid_expansion_costs = grid_expansion_costs
-        self.storages = storages
-        self._s_res = s_res
+        self._load = load
+
+    @property
+    def grid_expansion_costs(self):
+        return self._load('grid_expansion_costs')
+
+    @property
+    def storages(self):
+        return self._load('storages')
 
     def s_res(self):
-        return self._s_res
+        return self._load('s_res')
+
+
+class _AnytimeCostEstimate:
+    """
+    Progressive estimate of the grid expansion costs of all MV grids
+
+    Each time an MV grid is finished, its overnight costs per voltage level
+    are added and the costs of all MV grids are extrapolated with the
+    cluster weights, i.e. the weighted mean of the finished grids is scaled
+    to the total weight. The confidence interval is based on the weighted
+    sample variance of the finished grids, their effective number
+    ``n_eff = (sum w)^2 / sum w^2``, a t-quantile with ``n_eff - 1``
+    degrees of freedom and a finite population correction with the share
+    of weight that is not finished yet. With ``n_eff < 2`` the interval is
+    unbounded.
+
+    The interval assumes that the finished MV grids are a random sample,
+    so the MV grids should be calculated in random order. As small MV grids
+    finish first all the same, the chosen MV grids are divided into strata
+    of similar size (number of nodes) and the estimate is only considered
+    stable once every stratum has a finished MV grid.
+
+    Parameters
+    ----------
+    grid_choice : :pandas:`pandas.DataFrame<dataframe>`
+        Chosen MV grids and their weightings
+    tolerance : None or float
+        Relative half width of the confidence interval of the total costs
+        that is considered stable (e.g. ``0.05``). If None, the estimate is
+        never considered stable.
+    min_grids : int
+        Minimum number of finished MV grids before the estimate can be
+        considered stable
+    min_weight_share : float
+        Minimum share of the total weight of the finished MV grids before
+        the estimate can be considered stable
+    grid_size : None or :pandas:`pandas.Series<series>`
+        Number of nodes per MV grid (index). If None, the MV grids are not
+        stratified.
+    no_strata : int
+        Number of size strata, bounded by quantiles of the sizes of the
+        chosen MV grids. Default: 3
+    confidence : float
+        Confidence level of the interval. Default: 0.95
+
+    """
+
+    def __init__(self, grid_choice, tolerance=None, min_grids=5,
+                 min_weight_share=0.2, grid_size=None, no_strata=3,
+                 confidence=0.95):
+        # Kept as reference, since representatives may be substituted
+        self._grid_choice = grid_choice
+        self._total_weight = grid_choice['no_of_points_per_cluster'].sum()
+        self._tolerance = tolerance
+        self._min_grids = min_grids
+        self._min_weight_share = min_weight_share
+        self._confidence = confidence
+
+        self._grid_size = grid_size
+        self._strata_bounds = None
+        if grid_size is not None and no_strata > 1:
+            sizes = grid_size.reindex(
+                grid_choice['the_selected_network_id'].astype(int)).dropna()
+            if not sizes.empty:
+                self._strata_bounds = np.unique(np.percentile(
+                    sizes.values,
+                    np.linspace(0, 100, no_strata + 1)[1:-1]))
+
+        # Overnight costs in kEUR of finished grids (rows) per voltage level
+        self._costs = pd.DataFrame(columns=['total'], dtype=float)
+        self._history = []
+
+    def add(self, mv_grid_id, grid_expansion_costs):
+        """
+        Adds the results of a finished MV grid
+
+        Parameters
+        ----------
+        mv_grid_id : int
+            MV grid ID
+        grid_expansion_costs : None or :pandas:`pandas.DataFrame<dataframe>`
+            Grid expansion costs of this MV grid
+
+        """
+        if grid_expansion_costs is not None:
+            costs = grid_expansion_costs.groupby(
+                'voltage_level')['total_costs'].sum()
+        else:
+            # Grid was not reinforced
+            costs = pd.Series()
+
+        costs['total'] = costs.sum()
+        self._costs = pd.concat(
+            [self._costs, costs.to_frame(int(mv_grid_id)).T]).fillna(0.)
+
+        self._history.append(self.estimate().assign(
+            time=strftime("%Y-%m-%d_%H:%M:%S", localtime()),
+            finished_grids=len(self._costs),
+            finished_weight=self._finished_weight()))
+
+    def _finished_weights(self):
+        weights = self._grid_choice.set_index(
+            'the_selected_network_id')['no_of_points_per_cluster']
+        weights.index = weights.index.astype(int)
+        return weights.reindex(self._costs.index).fillna(0)
+
+    def _finished_weight(self):
+        return self._finished_weights().sum()
+
+    def _strata(self, mv_grids):
+        """
+        Returns the size strata of the given MV grids. MV grids of unknown
+        size are left out.
+        """
+        if self._strata_bounds is None:
+            return set()
+        sizes = self._grid_size.reindex(
+            pd.Index(mv_grids).astype(int)).dropna()
+        return set(np.searchsorted(
+            self._strata_bounds, sizes.values, side='right'))
+
+    def _all_strata_finished(self):
+        selected = self._grid_choice['the_selected_network_id']
+        return self._strata(selected) <= self._strata(self._costs.index)
+
+    def estimate(self):
+        """
+        Returns the current estimate of the costs of all MV grids
+
+        Returns
+        -------
+        :pandas:`pandas.DataFrame<dataframe>`
+            Extrapolated overnight costs in EUR and their confidence
+            interval (columns) per voltage level and in total (index)
+
+        """
+        w = self._finished_weights().values.astype(float)
+        costs = self._costs.astype(float) * 1000
+
+        # In eDisGo all costs are in kEuro (eGo only takes Euro)
+        mean = costs.mul(w, axis=0).sum() / w.sum()
+        n_eff = w.sum() ** 2 / (w ** 2).sum() if len(w) else 0.
+        fpc = max(1 - w.sum() / self._total_weight, 0.)
+
+        if fpc == 0:
+            # All MV grids are finished
+            half_width = mean * 0.
+        elif n_eff < 2:
+            half_width = mean * 0. + float('inf')
+        else:
+            # Weighted sample variance, corrected for the effective number
+            variance = ((costs - mean) ** 2).mul(w, axis=0).sum() / \
+                w.sum() * n_eff / (n_eff - 1)
+            quantile = student_t.ppf(
+                (1 + self._confidence) / 2, n_eff - 1)
+            half_width = quantile * (variance / n_eff * fpc) ** 0.5
+
+        estimate = pd.DataFrame({
+            'overnight_costs': mean * self._total_weight,
+            'lower': (mean - half_width) * self._total_weight,
+            'upper': (mean + half_width) * self._total_weight},
+            columns=['overnight_costs', 'lower', 'upper'])
+        estimate.index.name = 'voltage_level'
+
+        return estimate
+
+    def is_stable(self):
+        """
+        Returns
+        -------
+        bool
+            ``True`` if enough MV grids are finished (see **min_grids** and
+            **min_weight_share**), every size stratum has a finished MV grid
+            and the relative half width of the confidence interval of the
+            total costs is within the tolerance
+        """
+        if self._tolerance is None or self._costs.empty:
+            return False
+
+        weights = self._finished_weights()
+        if (len(self._costs) < self._min_grids or
+                weights.sum() < self._min_weight_share * self._total_weight):
+            return False
+        if not self._all_strata_finished():
+            return False
+        if weights.sum() ** 2 / (weights ** 2).sum() < 2:
+            return False
+
+        total = self.estimate().loc['total']
+        if total['overnight_costs'] == 0:
+            return total['upper'] == 0
+
+        half_width = (total['upper'] - total['lower']) / 2
+        return half_width / total['overnight_costs'] <= self._tolerance
+
+    @property
+    def history(self):
+        """
+        Returns
+        -------
+        :pandas:`pandas.DataFrame<dataframe>`
+            All estimates since the first MV grid was finished
+        """
+        if not self._history:
+            return pd.DataFrame()
+        return pd.concat(self._history).reset_index()
 
 
 def parallelizer(
@@ -1334,7 +2530,9 @@ def parallelizer(
         func_arguments,
         max_calc_time,
         workers=mp2.cpu_count(),
-        worker_lifetime=1):
+        worker_lifetime=1,
+        progress_callback=None,
+        substitute=None):
     """
     Use python multiprocessing toolbox for parallelization
 
@@ -1353,6 +2551,13 @@ def parallelizer(
         Number of parallel process
     worker_lifetime : int
         Bunch of grids sequentially analyzed by a worker
+    progress_callback : None or function
+        Called with the ID and the result of each successfully calculated
+        grid. If it returns ``True``, all remaining calculations are
+        stopped.
+    substitute : None or function
+        Called with the ID of each failed grid. If it returns another grid
+        ID, this grid is calculated instead (within the remaining time).
 
     Notes
     -----
@@ -1399,16 +2604,19 @@ def parallelizer(
         initializer=initializer,
         maxtasksperchild=worker_lifetime)
 
-    result_objects = {}
-    for ding0_id in ding0_id_list:
+    def submit(ding0_id):
         edisgo_args = (ding0_id, *func_arguments)
 
-        result_objects[ding0_id] = pool.apply_async(
+        return pool.apply_async(
             func=func,
             args=edisgo_args,
             callback=collect_pool_results,
             error_callback=error_callback(ding0_id))
 
+    result_objects = {}
+    for ding0_id in ding0_id_list:
+        result_objects[ding0_id] = submit(ding0_id)
+
     errors = {}
     successes = {}
     start = datetime.now()
@@ -1418,45 +2626,63 @@ def parallelizer(
         .format(end[:end.index('.')]))
     current = datetime.now()
     time_spent = 0
-    while (result_objects and
-            ((current - start).seconds <= max_calc_time_seconds)):
-        done = []
-        tick = (current - start).seconds * 100 / max_calc_time_seconds
-        if tick - time_spent >= 1 or tick > 100:
-            hours_to_go = (current - start).seconds / 3600
-            logger.info("{:.2f}% ({:.2f}/{}h) spent"
-                        .format(tick, hours_to_go, max_calc_time))
-            logger.info("Jobs time out in {:.2f}h."
-                        .format(max_calc_time - hours_to_go))
-            time_spent = tick
-        for grid, result in result_objects.items():
-            if result.ready():
-                logger.info(
-                    "MV grid {} ready. Trying to `get` the result."
-                    .format(grid))
-                done.append(grid)
-                if not result.successful():
-                    try:
-                        # We already know that this was not successful, so the
-                        # `get` is only here to re-raise the exception that
-                        # occurred.
-                        result.get()
-                    except Exception as e:
-                        logger.warning(
-                            "MV grid {} failed due to {e!r}: '{e}'."
-                            .format(grid, e=e))
-                        errors[grid] = e
-                else:
+    stop = False
+    try:
+        while (result_objects and not stop and
+                ((current - start).seconds <= max_calc_time_seconds)):
+            done = []
+            substitutes = []
+            tick = (current - start).seconds * 100 / max_calc_time_seconds
+            if tick - time_spent >= 1 or tick > 100:
+                hours_to_go = (current - start).seconds / 3600
+                logger.info("{:.2f}% ({:.2f}/{}h) spent"
+                            .format(tick, hours_to_go, max_calc_time))
+                logger.info("Jobs time out in {:.2f}h."
+                            .format(max_calc_time - hours_to_go))
+                time_spent = tick
+            for grid, result in result_objects.items():
+                if result.ready():
+                    logger.info(
+                        "MV grid {} ready. Trying to `get` the result."
+                        .format(grid))
+                    done.append(grid)
+                    if not result.successful():
+                        try:
+                            # We already know that this was not successful,
+                            # so the `get` is only here to re-raise the
+                            # exception that occurred.
+                            result.get()
+                        except Exception as e:
+                            logger.warning(
+                                "MV grid {} failed due to {e!r}: '{e}'."
+                                .format(grid, e=e))
+                            errors[grid] = e
+                        if substitute is not None:
+                            substitute_id = substitute(grid)
+                            if substitute_id is not None:
+                                substitutes.append(substitute_id)
+                    else:
+                        logger.info(
+                            "MV grid {} calculated successfully.".format(grid))
+                        successes[grid] = result.get()
+                        if (progress_callback is not None
+                                and progress_callback(grid, successes[grid])):
+                            stop = True
                     logger.info(
-                        "MV grid {} calculated successfully.".format(grid))
-                    successes[grid] = result.get()
+                        "Done `get`ting the result for MV grid {}."
+                        .format(grid))
+            for grid in done:
+                del result_objects[grid]
+            for grid in substitutes:
                 logger.info(
-                    "Done `get`ting the result for MV grid {}."
-                    .format(grid))
-        for grid in done:
-            del result_objects[grid]
-        sleep(1)
-        current = datetime.now()
+                    "MV grid {} is calculated as substitute.".format(grid))
+                result_objects[grid] = submit(grid)
+            sleep(1)
+            current = datetime.now()
+    except BaseException:
+        # E.g. an error in a callback or a keyboard interrupt
+        pool.terminate()
+        raise
 
     # Now we know that we either reached the timeout, (x)or that all
     # calculations are done. We just have collect what exactly is the case.
@@ -1465,6 +2691,9 @@ def parallelizer(
     # collect like all other errors.
     if not result_objects:
         logger.info("All MV grids stopped before the timeout.")
+    elif stop:
+        logger.info("Remaining MV grid simulations are stopped.")
+        pool.terminate()
     else:
         logger.warning("Some MV grid simulations timed out.")
         pool.terminate()
@@ -1484,6 +2713,12 @@ def parallelizer(
             logger.warning(
                 "MV grid {} failed due to {e!r}: '{e}'.".format(grid, e=e))
             errors[grid] = e
+        else:
+            # Finished between the last poll and the termination of the
+            # pool. Its result is committed like all others, the remaining
+            # calculations are stopped anyway.
+            if progress_callback is not None:
+                progress_callback(grid, successes[grid])
     for grid in done:
         del result_objects[grid]
 
@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+# Copyright 2016-2018 Europa-Universität Flensburg,
+# Flensburg University of Applied Sciences,
+# Centre for Sustainable Energy Systems
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation; either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# File description
+"""This module contains the result store of all MV grids of an eDisGo run.
+
+The results of each MV grid are committed as soon as the grid is finished:
+they are written to temporary files, which then replace the grid's files in
+the store folder (``edisgo_results``) of the results folder at once. Grids
+are thus never partially written, a crash only loses the grid being
+written, and other processes can read finished grids while the run is still
+going.
+
+Each MV grid has an HDF5 file (``grid_<MV grid ID>.h5``). Apparent powers
+(``s_res``, time steps x lines) are the largest result. Their values are
+saved as binary array (``grid_<MV grid ID>_s_res.npy``) and read
+memory-mapped, their index and columns are kept in the HDF5 file.
+
+The status of each MV grid is appended to a commit log (``run_status.csv``)
+after its results are in the store. While a run is still going, all grids
+logged as ``'finished'`` can be read.
+"""
+import os
+import re
+import csv
+import logging
+import threading
+from time import localtime, strftime
+
+if not 'READTHEDOCS' in os.environ:
+    import numpy as np
+    import pandas as pd
+
+__copyright__ = ("Flensburg University of Applied Sciences, "
+                 "Europa-Universität Flensburg, "
+                 "Centre for Sustainable Energy Systems")
+__license__ = "GNU Affero General Public License Version 3 (AGPL-3.0)"
+__author__ = "wolf_bunke, maltesc"
+
+logger = logging.getLogger(__name__)
+
+STORE_FOLDER = 'edisgo_results'
+STATUS_FILE = 'run_status.csv'
+
+STATUS_COLUMNS = ['mv_grid_id', 'time', 'status', 'message']
+
+RESULT_PARTS = ['grid_expansion_costs', 's_res', 'storages']
+
+grid_file_pattern = re.compile(r'^grid_(\d+)\.h5$')
+
+# PyTables is not thread-safe, all accesses of this process are serialised
+_lock = threading.RLock()
+
+
+def store_path(results):
+    """
+    Returns the path of the result store in a results folder
+
+    Parameters
+    ----------
+    results : :obj:`str`
+        Path to the eDisGo results folder
+
+    Returns
+    -------
+    :obj:`str`
+        Path to the store folder
+
+    """
+    return os.path.join(results, STORE_FOLDER)
+
+
+def _grid_file(path, mv_grid_id):
+    return os.path.join(path, 'grid_{}.h5'.format(int(mv_grid_id)))
+
+
+def _s_res_file(path, mv_grid_id):
+    return os.path.join(path, 'grid_{}_s_res.npy'.format(int(mv_grid_id)))
+
+
+def _replace(tmp_file, file):
+    """
+    Moves a completely written temporary file into place
+    """
+    with open(tmp_file, 'rb') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_file, file)
+
+
+def write_grid(path, mv_grid_id, bundle):
+    """
+    Commits the results of a single MV grid to the result store. Existing
+    results of this MV grid are replaced.
+
+    Parameters
+    ----------
+    path : :obj:`str`
+        Path to the store folder
+    mv_grid_id : int
+        MV grid ID
+    bundle : :obj:`dict`
+        Results of the MV grid, as returned by
+        :func:`ego.tools.edisgo_integration._result_bundle`
+
+    """
+    os.makedirs(path, exist_ok=True)
+
+    grid_file = _grid_file(path, mv_grid_id)
+    s_res_file = _s_res_file(path, mv_grid_id)
+    suffix = '.{}.tmp'.format(os.getpid())
+
+    s_res = bundle['s_res']
+    config = pd.DataFrame(
+        [(section, option, value)
+         for section, values in bundle['edisgo_config'].items()
+         for option, value in values.items()],
+        columns=['section', 'option', 'value'])
+
+    try:
+        with open(s_res_file + suffix, 'wb') as f:
+            np.save(f, np.ascontiguousarray(s_res.values, dtype=np.float64))
+
+        with _lock, pd.HDFStore(grid_file + suffix, mode='w') as store:
+            for part in ['grid_expansion_costs', 'storages']:
+                store.put(part, bundle[part], format='fixed')
+            store.put('s_res_index',
+                      pd.Series(s_res.index, name=s_res.index.name),
+                      format='fixed')
+            store.put('s_res_columns',
+                      pd.Series(s_res.columns, name=s_res.columns.name),
+                      format='fixed')
+            for name, df in bundle['pypsa'].items():
+                store.put('pypsa/' + name, df, format='fixed')
+            store.put('config', config, format='fixed')
+
+        # The array is in place before the grid file refers to it
+        _replace(s_res_file + suffix, s_res_file)
+        _replace(grid_file + suffix, grid_file)
+
+    finally:
+        for tmp_file in [s_res_file + suffix, grid_file + suffix]:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+
+
+def stored_grids(path):
+    """
+    Lists all MV grids in the result store
+
+    Parameters
+    ----------
+    path : :obj:`str`
+        Path to the store folder
+
+    Returns
+    -------
+    :obj:`list`
+        MV grid ID's. Empty if there is no result store.
+
+    """
+    if not os.path.isdir(path):
+        return []
+
+    return sorted(
+        int(match.group(1)) for match in map(
+            grid_file_pattern.match, os.listdir(path))
+        if match)
+
+
+def has_grid(path, mv_grid_id):
+    """
+    Returns
+    -------
+    bool
+        ``True`` if the result store contains the MV grid
+    """
+    return os.path.isfile(_grid_file(path, mv_grid_id))
+
+
+def remove_grids(path):
+    """
+    Removes all MV grids from the result store, e.g. at the start of a new
+    run
+
+    Parameters
+    ----------
+    path : :obj:`str`
+        Path to the store folder
+
+    """
+    for mv_grid_id in stored_grids(path):
+        for file in [_grid_file(path, mv_grid_id),
+                     _s_res_file(path, mv_grid_id)]:
+            if os.path.isfile(file):
+                os.remove(file)
+
+
+def read_part(path, mv_grid_id, part):
+    """
+    Reads a single result of an MV grid from the result store
+
+    Parameters
+    ----------
+    path : :obj:`str`
+        Path to the store folder
+    mv_grid_id : int
+        MV grid ID
+    part : :obj:`str`
+        ``'grid_expansion_costs'``, ``'s_res'``, ``'storages'``, ``'pypsa'``
+        or ``'edisgo_config'``
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<dataframe>` or :obj:`dict`
+        Result. PyPSA components and configs are returned as in
+        :func:`read_grid`, apparent powers are read-only and memory-mapped.
+
+    """
+    with _lock, pd.HDFStore(_grid_file(path, mv_grid_id), mode='r') as store:
+        return _read_part(store, path, mv_grid_id, part)
+
+
+def read_grid(path, mv_grid_id):
+    """
+    Reads all results of an MV grid from the result store
+
+    Parameters
+    ----------
+    path : :obj:`str`
+        Path to the store folder
+    mv_grid_id : int
+        MV grid ID
+
+    Returns
+    -------
+    :obj:`dict`
+        Results of the MV grid, same structure as written by
+        :func:`write_grid`
+
+    """
+    with _lock, pd.HDFStore(_grid_file(path, mv_grid_id), mode='r') as store:
+        return {
+            part: _read_part(store, path, mv_grid_id, part)
+            for part in RESULT_PARTS + ['pypsa', 'edisgo_config']}
+
+
+def _read_part(store, path, mv_grid_id, part):
+    if part == 's_res':
+        index = store.get('s_res_index')
+        columns = store.get('s_res_columns')
+        values = np.load(_s_res_file(path, mv_grid_id), mmap_mode='r')
+        return pd.DataFrame(
+            values,
+            index=pd.Index(index.values, name=index.name),
+            columns=pd.Index(columns.values, name=columns.name),
+            copy=False)
+
+    if part == 'pypsa':
+        components = store.get_node('/pypsa')
+        names = [] if components is None else components._v_children.keys()
+        # Buses first, as all other components refer to them
+        return {
+            name: store.get('pypsa/' + name)
+            for name in sorted(names, key=lambda name: name != 'Bus')}
+
+    if part == 'edisgo_config':
+        config = {}
+        for section, option, value in store.get(
+                'config').itertuples(index=False):
+            config.setdefault(section, {})[option] = value
+        return config
+
+    return store.get(part)
+
+
+def log_status(results, mv_grid_id, status, message=''):
+    """
+    Appends the status of an MV grid to the commit log of a results folder
+
+    Parameters
+    ----------
+    results : :obj:`str`
+        Path to the eDisGo results folder
+    mv_grid_id : int
+        MV grid ID
+    status : :obj:`str`
+        E.g. ``'finished'``, ``'reused'``, ``'failed'`` or ``'timeout'``.
+        ``'finished'`` and ``'reused'`` must only be logged when the results
+        of the grid are in the result store.
+    message : :obj:`str`
+        Additional information
+
+    """
+    path = os.path.join(results, STATUS_FILE)
+    row = [int(mv_grid_id), strftime("%Y-%m-%d_%H:%M:%S", localtime()),
+           status, message]
+
+    with _lock:
+        new = not os.path.isfile(path)
+        with open(path, 'a', newline='') as f:
+            writer = csv.writer(f)
+            if new:
+                writer.writerow(STATUS_COLUMNS)
+            writer.writerow(row)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def clear_status(results):
+    """
+    Removes the commit log of a results folder, e.g. at the start of a new
+    run
+
+    Parameters
+    ----------
+    results : :obj:`str`
+        Path to the eDisGo results folder
+
+    """
+    path = os.path.join(results, STATUS_FILE)
+    with _lock:
+        if os.path.isfile(path):
+            os.remove(path)
+
+
+def read_status(results):
+    """
+    Reads the latest status of each MV grid from the commit log of a results
+    folder
+
+    Parameters
+    ----------
+    results : :obj:`str`
+        Path to the eDisGo results folder
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<dataframe>`
+        Time, status and message, indexed by the MV grid ID. Empty if there
+        is no commit log.
+
+    """
+    path = os.path.join(results, STATUS_FILE)
+    if not os.path.isfile(path):
+        return pd.DataFrame(
+            columns=STATUS_COLUMNS[1:],
+            index=pd.Index([], name='mv_grid_id'))
+
+    with _lock:
+        status = pd.read_csv(path, keep_default_na=False)
+
+    return status.drop_duplicates(
+        'mv_grid_id', keep='last').set_index('mv_grid_id')
@@ -23,6 +23,7 @@ of eGo in order to build the eGo application container.
 import sys
 import os
 import json
+import time
 import logging
 logger = logging.getLogger('ego')
 import pandas as pd
@@ -49,8 +50,10 @@ if not 'READTHEDOCS' in os.environ:
         get_generator_investment,
         etrago_convert_overnight_cost)
     from ego.tools.utilities import (get_scenario_setting,
-                                     get_time_steps, fix_leading_separator)
+                                     get_time_steps, import_csv_network)
     from ego.tools.edisgo_integration import EDisGoNetworks
+    from ego.tools.mv_cluster import grid_cluster_index
+    from ego.tools import profiling
     from egoio.db_tables.model_draft import RenpassGisParameterRegion
     from egoio.db_tables import model_draft, grid
     from etrago.tools.plot import (plot_line_loading, plot_stacked_gen,
@@ -108,6 +111,10 @@ class egoBasic(object):
 
         self.json_file = get_scenario_setting(jsonpath=self.jsonpath)
 
+        if self.json_file['eGo'].get('profiling'):
+            profiling.enable()
+            logger.info('Profiling of eGo is switched on')
+
         # Database connection from json_file
         try:
             conn = db.connection(section=self.json_file['eTraGo']['db'])
@@ -121,6 +128,105 @@ class egoBasic(object):
         self.scn_name = self.json_file['eTraGo']['scn_name']
 
 
+class ETraGoResultTables:
+    """Container of the eTraGo networks and result tables of eGo.
+
+    Each result table is calculated on first access and kept. Call
+    :meth:`invalidate` after changing the networks.
+
+    Parameters
+    ----------
+    network : :class:`pypsa.Network`
+        eTraGo network
+    disaggregated_network : None or :class:`pypsa.Network`
+        Disaggregated eTraGo network
+    json_file : :obj:`dict`
+        Dictionary of the ``scenario_setting.json`` file
+    session : :sqlalchemy:`sqlalchemy.orm.session.Session<orm/session_basics.html>`
+        SQLAlchemy session to the OEDB
+    scn_name : :obj:`str`
+        Name of the scenario
+    """
+
+    def __init__(self, network, disaggregated_network, json_file, session,
+                 scn_name):
+        self.network = network
+        self.disaggregated_network = disaggregated_network
+        self._json_file = json_file
+        self._session = session
+        self._scn_name = scn_name
+        self._tables = {}
+
+    def _table(self, name, description, calculate):
+        if name not in self._tables:
+            with profiling.timer('eTraGo: ' + description):
+                self._tables[name] = calculate()
+        return self._tables[name]
+
+    def invalidate(self, *names):
+        """
+        Drops calculated result tables, so that they are calculated again
+        on next access
+
+        Parameters
+        ----------
+        *names : :obj:`str`
+            Names of the result tables (e.g. ``'operating_costs'``). All
+            result tables are dropped if no name is given.
+        """
+        if not names:
+            self._tables.clear()
+        for name in names:
+            self._tables.pop(name, None)
+
+    @property
+    def storage_investment_costs(self):
+        """
+        See :func:`ego.tools.storages.etrago_storages_investment`
+        """
+        return self._table(
+            'storage_investment_costs', 'Storage investment costs',
+            lambda: etrago_storages_investment(
+                self.network, self._json_file, self._session))
+
+    @property
+    def storage_charges(self):
+        """
+        See :func:`ego.tools.storages.etrago_storages`
+        """
+        return self._table(
+            'storage_charges', 'Storage charges',
+            lambda: etrago_storages(self.network))
+
+    @property
+    def operating_costs(self):
+        """
+        See :func:`ego.tools.economics.etrago_operating_costs`
+        """
+        return self._table(
+            'operating_costs', 'Operating costs',
+            lambda: etrago_operating_costs(self.network))
+
+    @property
+    def generator(self):
+        """
+        See :func:`ego.tools.results.create_etrago_results`
+        """
+        return self._table(
+            'generator', 'Generator results',
+            lambda: create_etrago_results(self.network, self._scn_name))
+
+    @property
+    def grid_investment_costs(self):
+        """
+        See :func:`ego.tools.economics.etrago_grid_investment`
+        """
+        return self._table(
+            'grid_investment_costs', 'Grid investment costs',
+            lambda: etrago_grid_investment(
+                self.network, self._json_file, self._session))
+
+
 class eTraGoResults(egoBasic):
     """The ``eTraGoResults`` class creates and contains all results
     of eTraGo  and it's network container for eGo.
@@ -129,8 +235,8 @@ class eTraGoResults(egoBasic):
     -------
     network_etrago: :class:`etrago.tools.io.NetworkScenario`
         eTraGo network object compiled by :func:`etrago.appl.etrago`
-    etrago: :pandas:`pandas.Dataframe<dataframe>`
-        DataFrame which collects several eTraGo results
+    etrago: :class:`ETraGoResultTables`
+        Container which collects several eTraGo results
     """
 
     def __init__(self, *args, **kwargs):
@@ -202,36 +308,19 @@ class eTraGoResults(egoBasic):
                 # get pathway
                 pathway = self.json_file['eGo'].get('csv_import_eTraGo')
 
-                try:
-                    # create Network from csv
-                    self._etrago_network = pypsa.Network()
-                    self._etrago_network.import_from_csv_folder(pathway)
-                    logger.info('Create eTraGo network from CSV result')
-
-                    # get disaggregation
-                    self._etrago_disaggregated_network = pypsa.Network()
-                    self._etrago_disaggregated_network.\
-                        import_from_csv_folder(pathway+'/disaggregated')
-                    logger.info('Create eTraGo disaggregated network '
-                                'from CSV result')
-
-                except TypeError:
-                    file_path = "disaggregated/network.csv"
-                    fix_leading_separator(pathway+"/"+file_path)
-
-                    file_path = "network.csv"
-                    fix_leading_separator(pathway+"/"+file_path)
-
-                    self._etrago_network = pypsa.Network()
-                    self._etrago_network.import_from_csv_folder(pathway)
-                    logger.info('Create eTraGo network from CSV result')
-
-                    # get disaggregation
-                    self._etrago_disaggregated_network = pypsa.Network()
-                    self._etrago_disaggregated_network.\
-                        import_from_csv_folder(pathway+'/disaggregated')
-                    logger.info('Create eTraGo disaggregated network'
-                                'from CSV result')
+                t0 = time.perf_counter()
+                # create Network from csv (or its binary snapshot)
+                self._etrago_network = import_csv_network(pathway)
+                logger.info('Create eTraGo network from CSV result')
+
+                # get disaggregation
+                self._etrago_disaggregated_network = import_csv_network(
+                    pathway+'/disaggregated')
+                logger.info('Create eTraGo disaggregated network '
+                            'from CSV result')
+
+                profiling.record(
+                    'eTraGo: CSV import', time.perf_counter() - t0)
 
                 args_name = "args.json"
                 with open(pathway+'/'+args_name) as f:
@@ -260,8 +349,9 @@ class eTraGoResults(egoBasic):
 
                 if self.json_file['eTraGo']['disaggregation'] != False:
 
-                    etrago_network, etrago_disaggregated_network = etrago(
-                        self.json_file['eTraGo'])
+                    with profiling.timer('eTraGo: Calculation'):
+                        etrago_network, etrago_disaggregated_network = \
+                            etrago(self.json_file['eTraGo'])
 
                     self._etrago_network = etrago_network
                     self._etrago_disaggregated_network = (
@@ -269,8 +359,9 @@ class eTraGoResults(egoBasic):
                 else:
                     logger.warning("Only one network is used.")
 
-                    etrago_network, etrago_disaggregated_network = etrago(
-                        self.json_file['eTraGo'])
+                    with profiling.timer('eTraGo: Calculation'):
+                        etrago_network, etrago_disaggregated_network = \
+                            etrago(self.json_file['eTraGo'])
 
                     self._etrago_network = etrago_network
                     self._etrago_disaggregated_network = (
@@ -279,22 +370,13 @@ class eTraGoResults(egoBasic):
         # Add selected results to results container
         # -----------------------------------------
 
-        self.etrago = pd.DataFrame()
-        self.etrago.network = self._etrago_network
-        self.etrago.disaggregated_network = self._etrago_disaggregated_network
-
-        # Add function
-        self.etrago.storage_investment_costs = etrago_storages_investment(
-            self.etrago.network, self.json_file, self.session)
-        self.etrago.storage_charges = etrago_storages(self.etrago.network)
-
-        self.etrago.operating_costs = etrago_operating_costs(
-            self.etrago.network)
-        self.etrago.generator = create_etrago_results(self.etrago.network,
-                                                      self.scn_name)
-        self.etrago.grid_investment_costs = \
-            etrago_grid_investment(self.etrago.network,
-                                   self.json_file, self.session)
+        # The result tables are calculated on first access
+        self.etrago = ETraGoResultTables(
+            self._etrago_network,
+            self._etrago_disaggregated_network,
+            self.json_file,
+            self.session,
+            self.scn_name)
 
         # add functions direct
         # self._etrago_network.etrago_line_loading = etrago_line_loading
@@ -449,9 +531,10 @@ class eDisGoResults(eTraGoResults):
         if self.json_file['eGo']['eDisGo'] is True:
             logger.info('Create eDisGo network')
 
-            self._edisgo = EDisGoNetworks(
-                json_file=self.json_file,
-                etrago_network=self.etrago.disaggregated_network)
+            with profiling.timer('eDisGo: Overall time (all grids)'):
+                self._edisgo = EDisGoNetworks(
+                    json_file=self.json_file,
+                    etrago_network=self.etrago.disaggregated_network)
         else:
             self._edisgo = None
             logger.info('No eDisGo network')
@@ -481,7 +564,7 @@ class eGo(eDisGoResults):
         Contains multiple eDisGo networks
     edisgo : :pandas:`pandas.Dataframe<dataframe>`
         aggregated results of eDisGo
-    etrago : :pandas:`pandas.Dataframe<dataframe>`
+    etrago : :class:`ETraGoResultTables`
         aggregated results of eTraGo
 
 
@@ -491,13 +574,52 @@ class eGo(eDisGoResults):
         self.jsonpath = jsonpath
         super(eGo, self).__init__(self,  *args, **kwargs)
 
-        # add total results here
+        # add total results here, investment costs are calculated on
+        # first access
         self._total_investment_costs = None
         self._total_operation_costs = None
-        self._calculate_investment_cost()
         self._storage_costs = None
         self._ehv_grid_costs = None
         self._mv_grid_costs = None
+        self._investment_costs_calculated = False
+
+    def report_performance(self):
+        """
+        Summarizes the timings collected so far and writes them to
+        ``performance.csv`` next to the eDisGo results or to the ``results``
+        folder. Results that are calculated on first access (e.g. the
+        investment costs) are only included once they were accessed.
+
+        Returns
+        -------
+        None or :pandas:`pandas.DataFrame<dataframe>`
+            Number of calls, total, mean and maximum time per section.
+            ``None`` if profiling is switched off.
+
+        """
+        if not profiling.is_enabled():
+            return None
+
+        if self.json_file['eGo']['eDisGo'] is True:
+            results_dir = self.json_file['eDisGo']['results']
+        else:
+            results_dir = 'results'
+
+        return profiling.report(
+            filename=os.path.join(results_dir, 'performance.csv'))
+
+    @property
+    def performance(self):
+        """
+        Summary of the timings collected so far, if profiling is switched
+        on. See :meth:`report_performance`.
+
+        Returns
+        -------
+        None or :pandas:`pandas.DataFrame<dataframe>`
+
+        """
+        return self.report_performance()
 
     def _calculate_investment_cost(
             self,
@@ -512,7 +634,7 @@ class eGo(eDisGoResults):
                                                      ])
         _grid_ehv = None
         if 'network' in self.json_file['eTraGo']['extendable']:
-            _grid_ehv = self.etrago.grid_investment_costs
+            _grid_ehv = self.etrago.grid_investment_costs.copy()
             _grid_ehv['component'] = 'grid'
 
             self._total_inv_cost = self._total_inv_cost.\
@@ -520,7 +642,7 @@ class eGo(eDisGoResults):
 
         _storage = None
         if 'storage' in self.json_file['eTraGo']['extendable']:
-            _storage = self.etrago.storage_investment_costs
+            _storage = self.etrago.storage_investment_costs.copy()
             _storage['component'] = 'storage'
 
             self._total_inv_cost = self._total_inv_cost.\
@@ -531,6 +653,7 @@ class eGo(eDisGoResults):
 
             _grid_mv_lv = self.edisgo.grid_investment_costs
             if _grid_mv_lv is not None:
+                _grid_mv_lv = _grid_mv_lv.copy()
                 _grid_mv_lv['component'] = 'grid'
                 _grid_mv_lv['differentiation'] = 'domestic'
 
@@ -647,6 +770,9 @@ class eGo(eDisGoResults):
 
         integrated_storage = .0  # Storage integrated in MV grids
 
+        grid_choice = self.edisgo.grid_choice
+        grid_cluster = grid_cluster_index(grid_choice)
+
         for idx, row in stor_df.iterrows():
             bus_id = row['bus']
             p_nom_opt = row['p_nom_opt']
@@ -659,18 +785,12 @@ class eGo(eDisGoResults):
             logger.info("Checking storage integration for MV grid {}".format(
                 mv_grid_id))
 
-            grid_choice = self.edisgo.grid_choice
-
-            cluster = grid_choice.loc[
-                [mv_grid_id in repr_grids for repr_grids in grid_choice[
-                    'represented_grids']]]
-
-            if len(cluster) == 0:
+            if mv_grid_id not in grid_cluster.index:
                 continue
 
             else:
-                representative_grid = cluster[
-                    'the_selected_network_id'].values[0]
+                representative_grid = grid_choice.at[
+                    grid_cluster[mv_grid_id], 'the_selected_network_id']
 
             if hasattr(self.edisgo.network[representative_grid], 'network'):
                 integration_df = self.edisgo.network[
@@ -687,6 +807,27 @@ class eGo(eDisGoResults):
 
         return integrated_storage
 
+    def _investment_costs(self):
+        """
+        Calculates the investment costs on first access
+        """
+        if not self._investment_costs_calculated:
+            with profiling.timer('eGo: Investment costs'):
+                self._calculate_investment_cost()
+            self._investment_costs_calculated = True
+
+    def invalidate(self):
+        """
+        Drops the calculated investment costs and eTraGo result tables, so
+        that they are calculated again on next access
+        """
+        self._investment_costs_calculated = False
+        self._total_investment_costs = None
+        self._storage_costs = None
+        self._ehv_grid_costs = None
+        self._mv_grid_costs = None
+        self.etrago.invalidate()
+
     @property
     def total_investment_costs(self):
         """
@@ -697,9 +838,52 @@ class eGo(eDisGoResults):
         :pandas:`pandas.DataFrame<dataframe>`
 
         """
+        self._investment_costs()
 
         return self._total_investment_costs
 
+    @property
+    def storage_costs(self):
+        """
+        Investment costs of eTraGo's storages
+
+        Returns
+        -------
+        None or :pandas:`pandas.DataFrame<dataframe>`
+
+        """
+        self._investment_costs()
+
+        return self._storage_costs
+
+    @property
+    def ehv_grid_costs(self):
+        """
+        Investment costs of eTraGo's grid expansion
+
+        Returns
+        -------
+        None or :pandas:`pandas.DataFrame<dataframe>`
+
+        """
+        self._investment_costs()
+
+        return self._ehv_grid_costs
+
+    @property
+    def mv_grid_costs(self):
+        """
+        Investment costs of eDisGo's grid expansion
+
+        Returns
+        -------
+        None or :pandas:`pandas.DataFrame<dataframe>`
+
+        """
+        self._investment_costs()
+
+        return self._mv_grid_costs
+
     @property
     def total_operation_costs(self):
         """
@@ -726,7 +910,7 @@ class eGo(eDisGoResults):
             display = True
 
         return plot_grid_storage_investment(
-            self._total_investment_costs,
+            self.total_investment_costs,
             filename=filename,
             display=display,
             **kwargs)
@@ -29,156 +29,217 @@ __author__ = "wolf_bunke, maltesc"
 # Import
 #from __future__ import print_function
 import os
+import re
+import ast
+import json
+import hashlib
 import logging
 
 if not 'READTHEDOCS' in os.environ:
     import pickle
+    import multiprocess as mp2
+    import networkx as nx
     
     import pandas as pd
     
-    from sklearn.cluster import KMeans
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+    from sklearn.metrics import silhouette_score
+    from scipy.cluster.hierarchy import linkage, to_tree
+    import heapq
     import numpy as np
     
 logger = logging.getLogger(__name__)
 
-def analyze_attributes(ding0_files):
+GRID_SUMMARY = 'ding0_grids_summary.csv'
+
+ding0_file_pattern = re.compile(r'^ding0_grids__(\d+)\.pkl$')
+
+
+def list_ding0_files(ding0_files):
     """
-    Calculates the attributes wind and solar capacity and farthest node
-    for all files in ding0_files. Results are written to ding0_files
-    
+    Lists all ding0 grid files in ding0_files
+
     Parameters
     ----------
     ding0_files : :obj:`str`
         Path to ding0 files
-        
+
+    Returns
+    -------
+    :obj:`dict`
+        File names, keyed by the MV grid ID
+
+    """
+    files = {}
+    for file in os.listdir(ding0_files):
+        match = ding0_file_pattern.match(file)
+        if match:
+            files[int(match.group(1))] = file
+
+    return files
+
+
+def build_grid_summary(ding0_files, workers=None):
+    """
+    Indexes all files in ding0_files and writes a summary of all MV grid
+    districts to ding0_files
+
+    The summary contains one row per grid with the generation capacities
+    by voltage level and type (``gen_mv_solar``, ``gen_lv_wind``, ...),
+    peak load, number of loads, line lengths, number of nodes, number of LV
+    grid districts and the farthest node. Consumers of these figures can
+    use the summary without unpickling the ding0 files.
+
+    The grid files are analysed in parallel. Every row is keyed by the
+    modification time and size of its file, so only new or changed grid
+    files are analysed again. Rows of removed grid files and of grid files
+    that cannot be analysed (anymore) are dropped.
+
+    Parameters
+    ----------
+    ding0_files : :obj:`str`
+        Path to ding0 files
+    workers : None or int
+        Number of parallel processes. Default: number of CPUs
+
+    Returns
+    -------
+    summary : :pandas:`pandas.DataFrame<dataframe>`
+        Summary of all MV grid districts, indexed by the MV grid ID
+    not_found : :obj:`list`
+        MV grid IDs of the files that could not be analysed
+
     """
     base_path = ding0_files
 
-    not_found = []
-    tccs = []  # Total Cumulative Capacity of Solar
-    tccw = []  # Total Cumulative Capacity of Wind
-    fnlvmv = []  # the Farthest Node in both networks (lv and mv)
-    MV_id_list = []  # Distrct id list
+    files = list_ding0_files(base_path)
 
-    for district_number in list(range(1, 4000)):
+    summary_path = os.path.join(base_path, GRID_SUMMARY)
+    if os.path.isfile(summary_path):
+        summary = pd.read_csv(summary_path, index_col='file')
+    else:
+        summary = pd.DataFrame(columns=['mtime', 'size', 'id'])
+        summary.index.name = 'file'
 
+    # Only keep results of files that still exist
+    no_rows = len(summary)
+    summary = summary[summary.index.isin(list(files.values()))]
+    changed = len(summary) < no_rows
+
+    outdated = []
+    for district_number, file in sorted(files.items()):
+        stat = os.stat(os.path.join(base_path, file))
+        if (file not in summary.index
+                or summary.at[file, 'mtime'] != stat.st_mtime_ns
+                or summary.at[file, 'size'] != stat.st_size):
+            outdated.append(os.path.join(base_path, file))
+
+    logger.info(
+        '{} of {} ding0 grid files are analysed ({} indexed)'.format(
+            len(outdated), len(files), len(files) - len(outdated)))
+
+    not_found = []
+    if outdated:
+        changed = True
+        if workers is None:
+            workers = mp2.cpu_count()
+        pool = mp2.Pool(min(workers, len(outdated)))
         try:
-            pickle_name = 'ding0_grids__{}.pkl'.format(
-                district_number)  
-            nd = pickle.load(open(os.path.join(base_path, pickle_name), 'rb'))
-            print('District no.', district_number, 'found!')
-        except:
-            not_found.append(district_number)
-            continue
+            analysed = []
+            failed = []
+            for file_path, grid_summary, error in pool.imap_unordered(
+                    _analyze_grid_file, outdated):
+                file = os.path.basename(file_path)
+                if error is not None:
+                    logger.warning(
+                        'ding0 grid file {} could not be analysed: {}'.format(
+                            file, error))
+                    not_found.append(
+                        int(ding0_file_pattern.match(file).group(1)))
+                    failed.append(file)
+                    continue
+                analysed.append(grid_summary)
+        finally:
+            pool.close()
+            pool.join()
+
+        # Outdated rows of files that cannot be analysed anymore are dropped
+        summary = summary[~summary.index.isin(failed)]
+
+        if analysed:
+            analysed = pd.DataFrame(analysed).set_index('file')
+            summary = pd.concat(
+                [summary[~summary.index.isin(analysed.index)], analysed])
+
+        # Generator types that do not exist in a grid have no capacity
+        gen_cols = [col for col in summary if col.startswith('gen_')]
+        summary[gen_cols] = summary[gen_cols].fillna(0.)
+
+    if changed:
+        summary.to_csv(summary_path)
 
-        MV_id = 0
-        MV_id = nd._mv_grid_districts[0].id_db
-
-        mv_cum_solar_MV = 0  # Solar cumulative capacity in MV
-        mv_cum_wind_MV = 0  # Solar cumulative capacity in MV
-
-        # cumulative capacity of solar and wind in MV
-        for geno in nd._mv_grid_districts[0].mv_grid.generators():
-            if geno.type == 'solar':
-                mv_cum_solar_MV += geno.capacity
-            if geno.type == 'wind':
-                mv_cum_wind_MV += geno.capacity
-
-        lvg = 0
-        mv_cum_solar_LV = 0
-        mv_cum_wind_LV = 0
-
-        # cumulative capacity of solar and wind in LV
-        for lvgs in nd._mv_grid_districts[0].lv_load_areas():
-            for lvgs1 in lvgs.lv_grid_districts():
-                lvg += len(list(lvgs1.lv_grid.generators()))
-                for deno in lvgs1.lv_grid.generators():
-                    if deno.type == 'solar':
-                        mv_cum_solar_LV += deno.capacity
-                    if deno.type == 'wind':
-                        mv_cum_wind_LV += deno.capacity
-
-        # Total solar cumulative capacity in lv and mv
-        total_cum_solar = mv_cum_solar_MV + mv_cum_solar_LV
-        # Total wind cumulative capacity in lv and mv
-        total_cum_wind = mv_cum_wind_MV + mv_cum_wind_LV
-
-        # append to lists
-        tccs.append(total_cum_solar)
-        tccw.append(total_cum_wind)
-
-        # The farthest node length from MV substation
-        from ding0.core.network.stations import LVStationDing0
-
-        tot_dist = []
-        max_length = 0
-        max_length_list = []
-        max_of_max = 0
-
-        # make CB open (normal operation case)
-        nd.control_circuit_breakers(mode='open')
-        # setting the root to measure the path from
-        root_mv = nd._mv_grid_districts[0].mv_grid.station()
-        # 1st from MV substation to LV station node
-        # Iteration through nodes
-        for node2 in nd._mv_grid_districts[0].mv_grid._graph.nodes():
-            # select only LV station nodes
-            if isinstance(
-                    node2, 
-                    LVStationDing0) and not node2.lv_load_area.is_aggregated:
-
-                length_from_MV_to_LV_station = 0
-                # Distance from MV substation to LV station node
-                length_from_MV_to_LV_station = nd._mv_grid_districts[
-                        0
-                        ].mv_grid.graph_path_length(
-                    node_source=node2, node_target=root_mv) / 1000
-
-                # Iteration through lv load areas
-                for lvgs in nd._mv_grid_districts[0].lv_load_areas():
-                    for lvgs1 in lvgs.lv_grid_districts():  
-                        if lvgs1.lv_grid._station == node2:
-                            root_lv = node2  # setting a new root
-                            for node1 in lvgs1.lv_grid._graph.nodes():  
-
-                                length_from_LV_staion_to_LV_node = 0
-                                
-                                # Distance from LV station to LV nodes
-                                length_from_LV_staion_to_LV_node = (
-                                        lvgs1.lv_grid.graph_path_length(
-                                    node_source=node1, 
-                                    node_target=root_lv) / 1000)
-
-                                length_from_LV_node_to_MV_substation = 0
-                                
-                                # total distances in both grids MV and LV
-                                length_from_LV_node_to_MV_substation = (
-                                        length_from_MV_to_LV_station 
-                                        + length_from_LV_staion_to_LV_node)
-
-                                # append the total distance to a list
-                                tot_dist.append(
-                                    length_from_LV_node_to_MV_substation)
-                            if any(tot_dist):  
-                                max_length = max(tot_dist)
-                                
-                                # append max lengths of all grids to a list
-                                max_length_list.append(max_length)
-                    if any(max_length_list):  
-                        # to pick up max of max
-                        max_of_max = max(max_length_list)
-
-        fnlvmv.append(max_of_max)  # append to a new list
-        MV_id_list.append(MV_id)  # append the network id to a new list
+    summary = summary.reset_index().set_index('id').sort_index()
+    summary.index = summary.index.astype(int)
+
+    return summary, sorted(not_found)
+
+
+def load_grid_summary(ding0_files):
+    """
+    Loads the summary of all MV grid districts written by
+    :func:`build_grid_summary`
+
+    Parameters
+    ----------
+    ding0_files : :obj:`str`
+        Path to ding0 files
+
+    Returns
+    -------
+    None or :pandas:`pandas.DataFrame<dataframe>`
+        Summary of all MV grid districts, indexed by the MV grid ID. None
+        if ding0_files has not been indexed yet.
+
+    """
+    summary_path = os.path.join(ding0_files, GRID_SUMMARY)
+    if not os.path.isfile(summary_path):
+        return None
+
+    return pd.read_csv(summary_path, index_col='id')
+
+
+def analyze_attributes(ding0_files, workers=None):
+    """
+    Calculates the attributes wind and solar capacity and farthest node
+    for all files in ding0_files. Results are written to ding0_files
+
+    The attributes are taken from the summary of all grids, see
+    :func:`build_grid_summary`.
+
+    Parameters
+    ----------
+    ding0_files : :obj:`str`
+        Path to ding0 files
+    workers : None or int
+        Number of parallel processes. Default: number of CPUs
+
+    """
+    base_path = ding0_files
+
+    summary, not_found = build_grid_summary(base_path, workers=workers)
 
     # export results to dataframes
-    d = {'id': MV_id_list, 'Solar_cumulative_capacity': tccs,
-         'Wind_cumulative_capacity': tccw,
-         'The_Farthest_node': fnlvmv}  # assign lists to columns
-    # not founded networks
-    are_not_found = {'District_files_that_are_not_found': not_found}
+    df = summary.rename(columns={
+        'gen_solar': 'Solar_cumulative_capacity',
+        'gen_wind': 'Wind_cumulative_capacity',
+        'farthest_node': 'The_Farthest_node'})
+    df = df[[
+        'Solar_cumulative_capacity',
+        'Wind_cumulative_capacity',
+        'The_Farthest_node']].reset_index()
 
-    df = pd.DataFrame(d)  # dataframe for results
+    # not analysed networks
+    are_not_found = {'District_files_that_are_not_found': not_found}
 
     # dataframe for not found files id
     df_are_not_found = pd.DataFrame(are_not_found)
@@ -188,100 +249,859 @@ def analyze_attributes(ding0_files):
     df_are_not_found.to_csv(base_path + '/' + 'Not_found_grids.csv', sep=',')
 
 
-def cluster_mv_grids(      
+def _analyze_grid_file(file_path):
+    """
+    Summarises a single ding0 grid file
+
+    Parameters
+    ----------
+    file_path : :obj:`str`
+        Path to the ding0 grid file
+
+    Returns
+    -------
+    :obj:`tuple`
+        File path, dictionary of the grid summary (incl. the keys ``mtime``
+        and ``size``) and the error message if the analysis failed
+
+    """
+    try:
+        stat = os.stat(file_path)
+        with open(file_path, 'rb') as f:
+            nd = pickle.load(f)
+        grid_summary = _grid_summary(nd)
+    except Exception as e:
+        return file_path, None, repr(e)
+
+    grid_summary.update({
+        'file': os.path.basename(file_path),
+        'mtime': stat.st_mtime_ns,
+        'size': stat.st_size})
+
+    return file_path, grid_summary, None
+
+
+def _grid_summary(nd):
+    """
+    Summarises a ding0 network
+
+    Parameters
+    ----------
+    nd : :class:`ding0.core.NetworkDing0`
+        ding0 network
+
+    Returns
+    -------
+    :obj:`dict`
+        Summary of the MV grid district. Capacities and loads in kW,
+        lengths in km.
+
+    """
+    mv_grid_district = nd._mv_grid_districts[0]
+    mv_grid = mv_grid_district.mv_grid
+
+    summary = {'id': mv_grid_district.id_db,
+               'peak_load': mv_grid_district.peak_load,
+               'gen_solar': 0.,
+               'gen_wind': 0.}
+
+    def add_generators(grid, voltage_level):
+        for gen in grid.generators():
+            col = 'gen_{}_{}'.format(voltage_level, gen.type)
+            summary[col] = summary.get(col, 0.) + gen.capacity
+            # Total solar and wind cumulative capacity in lv and mv
+            if gen.type in ['solar', 'wind']:
+                summary['gen_' + gen.type] += gen.capacity
+
+    def line_length(grid):
+        return sum(edge['branch'].length for edge in grid.graph_edges()) / 1000
+
+    # MV grid
+    add_generators(mv_grid, 'mv')
+    summary['mv_loads'] = mv_grid.loads_count()
+    summary['mv_nodes'] = len(mv_grid._graph.nodes())
+    summary['mv_line_length'] = line_length(mv_grid)
+
+    # LV grids
+    summary.update({'lv_loads': 0,
+                    'lv_nodes': 0,
+                    'lv_line_length': 0.,
+                    'lv_load_areas': 0,
+                    'lv_grid_districts': 0})
+    for lvgs in mv_grid_district.lv_load_areas():
+        summary['lv_load_areas'] += 1
+        for lvgs1 in lvgs.lv_grid_districts():
+            lv_grid = lvgs1.lv_grid
+            summary['lv_grid_districts'] += 1
+            add_generators(lv_grid, 'lv')
+            summary['lv_loads'] += lv_grid.loads_count()
+            summary['lv_nodes'] += len(lv_grid._graph.nodes())
+            summary['lv_line_length'] += line_length(lv_grid)
+
+    summary['farthest_node'] = _farthest_node(nd)
+
+    return summary
+
+
+def _farthest_node(nd):
+    """
+    Calculates the length of the path from the MV substation to the
+    farthest node in both networks (lv and mv)
+
+    Parameters
+    ----------
+    nd : :class:`ding0.core.NetworkDing0`
+        ding0 network
+
+    Returns
+    -------
+    float
+        Path length in km
+
+    """
+    # make CB open (normal operation case)
+    nd.control_circuit_breakers(mode='open')
+
+    mv_grid = nd._mv_grid_districts[0].mv_grid
+
+    # 1st from MV substation to all MV nodes (incl. LV station nodes)
+    mv_distances = _graph_distances(mv_grid._graph, mv_grid.station())
+
+    max_of_max = 0
+    for lvgs in nd._mv_grid_districts[0].lv_load_areas():
+        if lvgs.is_aggregated:
+            continue
+        for lvgs1 in lvgs.lv_grid_districts():
+            root_lv = lvgs1.lv_grid._station
+            if root_lv not in mv_distances:
+                continue
+
+            # 2nd from LV station to all LV nodes
+            lv_distances = _graph_distances(lvgs1.lv_grid._graph, root_lv)
+            if not lv_distances:
+                continue
+
+            # total distances in both grids MV and LV
+            max_length = (mv_distances[root_lv] / 1000
+                          + max(lv_distances.values()) / 1000)
+            max_of_max = max(max_of_max, max_length)
+
+    return max_of_max
+
+
+def _graph_distances(graph, root):
+    """
+    Calculates the path lengths from root to all nodes of a ding0 graph
+    in a single breadth-first pass
+
+    As in :meth:`ding0.core.network.GridDing0.graph_path_length`, the paths
+    are the ones with the minimal count of hops. Since the circuit breakers
+    are open, the grids are radial and these paths are unique.
+
+    Parameters
+    ----------
+    graph : :networkx:`networkx.Graph<graph>`
+        Graph of a ding0 grid
+    root : :obj:`object`
+        Node the path lengths are measured from
+
+    Returns
+    -------
+    :obj:`dict`
+        Path lengths in m, keyed by node
+
+    """
+    if root not in graph:
+        return {}
+
+    distances = {root: 0}
+    for node_a, node_b in nx.bfs_edges(graph, root):
+        distances[node_b] = (
+            distances[node_a] + graph[node_a][node_b]['branch'].length)
+
+    return distances
+
+
+CLUSTER_BACKENDS = ['kmeans', 'minibatch', 'coreset', 'hierarchical']
+
+RANDOM_STATE = 1808
+
+CLUSTER_CACHE = 'cluster_cache'
+
+# Increased whenever the format of cached clustering results changes
+_CLUSTER_CACHE_VERSION = 3
+
+# Columns of the cluster dataframe and the diagnostics
+CLUSTER_COLUMNS = [
+    'no_of_points_per_cluster',
+    'cluster_percentage',
+    'the_selected_network_id',
+    'represented_grids']
+DIAGNOSTICS_COLUMNS = ['inertia', 'silhouette', 'cost_error']
+
+
+def cluster_mv_grids(
         no_grids,
-        cluster_base):
+        cluster_base,
+        backend='kmeans',
+        sample_size=None):
     """
     Clusters the MV grids based on the attributes, for a given number
     of MV grids
-    
+
     Parameters
     ----------
-    ding0_files : :obj:`str`
-        Path to ding0 files
     no_grids : int
         Desired number of clusters (of MV grids)
-        
+    cluster_base : :pandas:`pandas.DataFrame<dataframe>`
+        Clustering attributes (columns) of all MV grids (index). Any number
+        of attributes can be used.
+    backend : :obj:`str`
+        Clustering algorithm, see :func:`_fit_clusters`. Default: ``'kmeans'``
+    sample_size : None or int
+        Size of the sample in case of ``backend='coreset'``
+
     Returns
     -------
     :pandas:`pandas.DataFrame<dataframe>`
         Dataframe containing the clustered MV grids and their weightings
 
     """
-    cluster_base_pu = pd.DataFrame()
-    
-    for attribute in cluster_base:
-        attribute_max = cluster_base[attribute].max()
-        cluster_base_pu[attribute] = cluster_base[attribute] / attribute_max
-          
-    id_ = []
-    m = []
-    for idx, row in cluster_base_pu.iterrows():
-        id_.append(idx)
-        f = []
-        for attribute in row:
-            f.append(attribute)
-            
-        m.append(f)
-        
-    X = np.array(m)
-    
+    X = _normalise(cluster_base)
+
     logger.info(
-            'Used Clustering Attributes: \n {}'.format(
-                    list(cluster_base.columns)))
-        
-    no_clusters = no_grids  
-    
-    ran_state = 1808
+        'Used Clustering Attributes: \n {}'.format(
+            list(cluster_base.columns)))
+
+    no_clusters = no_grids
 
-    # Starting KMeans clustering
-    kmeans = KMeans(n_clusters=no_clusters, random_state=ran_state)
+    # Return a label for each point and the centers of clusters
+    cluster_labels, centroids, representatives = _fit_clusters(
+        X, no_clusters, backend=backend, sample_size=sample_size)
 
-    # Return a label for each point 
-    cluster_labels = kmeans.fit_predict(X)
+    return _cluster_df(
+        cluster_base.index, X, cluster_labels, centroids, representatives)
 
-    # Centers of clusters
-    centroids = kmeans.cluster_centers_
 
-    id_clus_dist = {}
+def evaluate_no_grids(
+        cluster_base,
+        candidates,
+        backend='kmeans',
+        sample_size=None,
+        workers=None):
+    """
+    Clusters the MV grids for several numbers of clusters (in parallel) and
+    rates each result
+
+    For each number of clusters, the following figures are calculated:
+
+    * ``inertia``: within-cluster sum of squared distances to the cluster
+      centers (normalised attributes)
+    * ``silhouette``: mean silhouette coefficient (based on a sample of at
+      most 2000 MV grids)
+    * ``cost_error``: proxy for the error of the extrapolated grid costs.
+      For each attribute, the sum over all MV grids is estimated by the
+      representative grids, weighted with their number of represented
+      grids. The maximum relative error of all attributes is returned.
+
+    Parameters
+    ----------
+    cluster_base : :pandas:`pandas.DataFrame<dataframe>`
+        Clustering attributes (columns) of all MV grids (index)
+    candidates : :obj:`list`
+        Numbers of clusters to be evaluated
+    backend : :obj:`str`
+        Clustering algorithm, see :func:`_fit_clusters`. Default: ``'kmeans'``
+    sample_size : None or int
+        Size of the sample in case of ``backend='coreset'``
+    workers : None or int
+        Number of parallel processes. Default: number of CPUs
 
-    # Iterate through each point in dataset array X
-    for i in range(len(X)):
-        clus = cluster_labels[i]  # point's cluster id
-        cent = centroids[cluster_labels[i]]  # Cluster's center coordinates
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<dataframe>`
+        Figures (columns) of all evaluated numbers of clusters (index
+        ``no_grids``)
+
+    """
+    X = _normalise(cluster_base)
+    candidates = [
+        no_clusters for no_clusters in candidates
+        if 2 <= no_clusters < len(X)]
 
-        # Distance from that point to cluster's center (3d coordinates)
-        dist = (
-                (X[i][0] - centroids[clus][0]) ** 2 
-                + (X[i][1] - centroids[clus][1]) ** 2 
-                + (X[i][2] - centroids[clus][2]) ** 2) ** (1 / 2)
+    if workers is None:
+        workers = mp2.cpu_count()
+    pool = mp2.Pool(max(min(workers, len(candidates)), 1))
+    try:
+        diagnostics = pool.map(
+            lambda no_clusters: _evaluate_clustering(
+                cluster_base, X, no_clusters, backend, sample_size),
+            candidates)
+    finally:
+        pool.close()
+        pool.join()
+
+    diagnostics = pd.DataFrame(
+        diagnostics,
+        columns=['no_grids'] + DIAGNOSTICS_COLUMNS)
+
+    return diagnostics.set_index('no_grids')
+
+
+def choose_no_grids(diagnostics, error_target):
+    """
+    Chooses the smallest number of clusters from which on the error target
+    is met by all larger evaluated numbers of clusters as well
+
+    The cost error is not monotonic in the number of clusters, a single
+    number of clusters may meet the target by a lucky choice of
+    representatives.
+
+    Parameters
+    ----------
+    diagnostics : :pandas:`pandas.DataFrame<dataframe>`
+        Figures of the evaluated numbers of clusters, see
+        :func:`evaluate_no_grids`
+    error_target : float
+        Maximum accepted ``cost_error`` (e.g. ``0.05``)
+
+    Returns
+    -------
+    int
+        Number of clusters (of MV grids)
+
+    """
+    if diagnostics.empty:
+        raise ValueError(
+            'No number of MV grids was evaluated. Automatic choice of the '
+            'number of MV grids needs more than 2 MV grids.')
+
+    diagnostics = diagnostics.sort_index()
+    meets_target = (diagnostics['cost_error'] <= error_target).astype(int)
+    # True if this and all larger numbers of clusters meet the target
+    stable = meets_target[::-1].cummin()[::-1].astype(bool)
+
+    feasible = diagnostics[stable]
+    if feasible.empty:
+        no_grids = int(diagnostics.index.max())
+        logger.warning(
+            'No number of MV grids meets the error target of {}. '
+            'Maximum number of {} MV grids (error {:.4f}) is used'.format(
+                error_target, no_grids,
+                diagnostics.at[no_grids, 'cost_error']))
+    else:
+        no_grids = int(feasible.index.min())
+        logger.info(
+            'From {} MV grids on, the error target of {} is met '
+            '(error {:.4f})'.format(
+                no_grids, error_target,
+                diagnostics.at[no_grids, 'cost_error']))
+
+    return no_grids
+
+
+def cluster_cache_key(cluster_base, **parameters):
+    """
+    Returns a key that identifies a clustering by the content of the
+    clustering attributes and all clustering parameters
+
+    Parameters
+    ----------
+    cluster_base : :pandas:`pandas.DataFrame<dataframe>`
+        Clustering attributes (columns) of all MV grids (index)
+    **parameters
+        Clustering parameters (e.g. ``no_grids`` or ``backend``). They must
+        be JSON serialisable.
+
+    Returns
+    -------
+    :obj:`str`
+        SHA-1 hex digest
+
+    """
+    key = hashlib.sha1()
+    key.update(pd.util.hash_pandas_object(
+        cluster_base, index=True).values.tobytes())
+    key.update(json.dumps(
+        [list(map(str, cluster_base.columns)), RANDOM_STATE,
+         _CLUSTER_CACHE_VERSION, parameters],
+        sort_keys=True).encode('utf-8'))
+
+    return key.hexdigest()
+
+
+def load_cached_clustering(ding0_files, key):
+    """
+    Loads a clustering that was saved by :func:`save_cached_clustering`
+
+    Parameters
+    ----------
+    ding0_files : :obj:`str`
+        Path to ding0 files
+    key : :obj:`str`
+        Key of the clustering, see :func:`cluster_cache_key`
+
+    Returns
+    -------
+    None or :obj:`tuple`
+        Cluster dataframe (see :func:`cluster_mv_grids`) and diagnostics
+        (see :func:`evaluate_no_grids`, None if the number of clusters was
+        given). None if there is no (readable) cache entry.
+
+    """
+    path = os.path.join(ding0_files, CLUSTER_CACHE, key + '.json')
+    if not os.path.isfile(path):
+        return None
+
+    try:
+        with open(path, 'r') as f:
+            entry = json.load(f)
+
+        cluster_df = pd.DataFrame(
+            entry['cluster_df'],
+            columns=['cluster_id'] + CLUSTER_COLUMNS).set_index('cluster_id')
+        cluster_df['represented_grids'] = [
+            [int(mv_grid_id) for mv_grid_id in grids]
+            for grids in cluster_df['represented_grids']]
+
+        diagnostics = entry['diagnostics']
+        if diagnostics is not None:
+            diagnostics = pd.DataFrame(
+                diagnostics, columns=['no_grids'] + DIAGNOSTICS_COLUMNS,
+                dtype=float)
+            diagnostics['no_grids'] = diagnostics['no_grids'].astype(int)
+            diagnostics = diagnostics.set_index('no_grids')
+
+    except Exception:
+        logger.warning('Clustering cache {} could not be read'.format(path))
+        return None
+
+    return cluster_df, diagnostics
+
+
+def save_cached_clustering(ding0_files, key, cluster_df, diagnostics=None):
+    """
+    Saves a clustering to the clustering cache in ding0_files
+
+    The clustering is saved as JSON file. If the cache cannot be written
+    (e.g. read-only ding0 files), a warning is logged.
+
+    Parameters
+    ----------
+    ding0_files : :obj:`str`
+        Path to ding0 files
+    key : :obj:`str`
+        Key of the clustering, see :func:`cluster_cache_key`
+    cluster_df : :pandas:`pandas.DataFrame<dataframe>`
+        Clustered MV grids, see :func:`cluster_mv_grids`
+    diagnostics : None or :pandas:`pandas.DataFrame<dataframe>`
+        Figures of all evaluated numbers of clusters, see
+        :func:`evaluate_no_grids`
+
+    """
+    def records(df):
+        return json.loads(df.reset_index().to_json(
+            orient='records', double_precision=15))
+
+    cache_dir = os.path.join(ding0_files, CLUSTER_CACHE)
+    path = os.path.join(cache_dir, key + '.json')
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+
+    try:
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+        entry = {
+            'cluster_df': records(cluster_df[CLUSTER_COLUMNS]),
+            'diagnostics': (None if diagnostics is None
+                            else records(diagnostics[DIAGNOSTICS_COLUMNS]))}
+
+        # Written to a temporary file first, so that parallel runs never
+        # read incomplete cache entries
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    except Exception:
+        logger.warning(
+            'Clustering could not be saved to cache {}'.format(path),
+            exc_info=True)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+GRID_CHOICE = 'grid_choice.csv'
+GRID_CHOICE_MEMBERS = 'grid_choice_members.csv'
+
+
+def write_grid_choice(grid_choice, results):
+    """
+    Saves a grid choice to a results folder
+
+    The clusters are saved to ``grid_choice.csv``, their members as long
+    table (cluster, rank, MV grid ID) to ``grid_choice_members.csv``. Each
+    file is replaced at once, so that readers never see a partially written
+    file. The members are written first. If the grid choice is not
+    replaced (e.g. after a crash), :func:`read_grid_choice` detects that
+    the files do not match.
+
+    Parameters
+    ----------
+    grid_choice : :pandas:`pandas.DataFrame<dataframe>`
+        Grid choice with columns 'no_of_points_per_cluster',
+        'the_selected_network_id' and 'represented_grids'
+    results : :obj:`str`
+        Path to the results folder
+
+    """
+    members = grid_choice['represented_grids']
+    lengths = [len(grids) for grids in members]
+    members = pd.DataFrame({
+        'cluster': np.repeat(grid_choice.index.values, lengths),
+        'rank': np.concatenate(
+            [np.arange(length) for length in lengths] + [[]]).astype(int),
+        'mv_grid_id': np.concatenate(
+            [list(grids) for grids in members] + [[]]).astype(int)},
+        columns=['cluster', 'rank', 'mv_grid_id'])
+
+    for file, df, kwargs in [(GRID_CHOICE_MEMBERS, members, {'index': False}),
+                             (GRID_CHOICE, grid_choice, {})]:
+        path = os.path.join(results, file)
+        df.to_csv(path + '.tmp', **kwargs)
+        os.replace(path + '.tmp', path)
+
+
+def read_grid_choice(grid_choice_file):
+    """
+    Reads a grid choice saved by :func:`write_grid_choice`
+
+    The members of the clusters are read from ``grid_choice_members.csv``
+    next to grid_choice_file. Grid choices saved before are parsed from the
+    column 'represented_grids' of grid_choice_file instead. This column is
+    also used if the members file does not match grid_choice_file, i.e. if
+    it does not contain the same clusters or a selected MV grid is not a
+    member of its cluster.
+
+    Parameters
+    ----------
+    grid_choice_file : :obj:`str`
+        Path to ``grid_choice.csv``
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<dataframe>`
+        Grid choice. The column 'represented_grids' contains the lists of
+        MV grid ID's of each cluster.
+
+    """
+    grid_choice = pd.read_csv(grid_choice_file, index_col=0)
+
+    members_file = os.path.join(
+        os.path.dirname(grid_choice_file), GRID_CHOICE_MEMBERS)
+
+    represented_grids = None
+    if os.path.isfile(members_file):
+        members = pd.read_csv(members_file).sort_values(['cluster', 'rank'])
+        represented_grids = {
+            cluster: grids.tolist() for cluster, grids
+            in members.groupby('cluster')['mv_grid_id']}
+
+        selected = grid_choice['the_selected_network_id'].astype(int)
+        if (set(represented_grids) != set(grid_choice.index) or
+                not all(mv_grid_id in represented_grids[cluster]
+                        for cluster, mv_grid_id in selected.items())):
+            if 'represented_grids' not in grid_choice.columns:
+                raise ValueError(
+                    '{} does not match {}'.format(
+                        members_file, grid_choice_file))
+            logger.warning(
+                '{} does not match {}, the members are taken from the '
+                'latter'.format(members_file, grid_choice_file))
+            represented_grids = None
+
+    if represented_grids is None:
+        represented_grids = {
+            cluster: list(ast.literal_eval(grids)) for cluster, grids
+            in grid_choice['represented_grids'].items()}
+
+    grid_choice['represented_grids'] = [
+        represented_grids.get(cluster, []) for cluster in grid_choice.index]
+
+    return grid_choice
+
+
+def grid_cluster_index(grid_choice):
+    """
+    Inverse index of a grid choice
+
+    Parameters
+    ----------
+    grid_choice : :pandas:`pandas.DataFrame<dataframe>`
+        Grid choice, see :func:`read_grid_choice`
+
+    Returns
+    -------
+    :pandas:`pandas.Series<series>`
+        Cluster of each represented MV grid, indexed by the MV grid ID
+
+    """
+    members = grid_choice['represented_grids']
+    lengths = [len(grids) for grids in members]
+
+    return pd.Series(
+        np.repeat(grid_choice.index.values, lengths),
+        index=pd.Index(np.concatenate(
+            [list(grids) for grids in members] + [[]]).astype(int),
+            name='mv_grid_id'),
+        name='cluster')
+
+
+def _normalise(cluster_base):
+    """
+    Returns the attributes per unit of their maximum. Attributes that are 0
+    for all grids stay 0.
+    """
+    attribute_max = cluster_base.max()
+    attribute_max[attribute_max == 0] = 1
+    return (cluster_base / attribute_max).values.astype(float)
+
+
+def _cluster_df(index, X, cluster_labels, centroids, representatives=None):
+    """
+    Builds the dataframe of the clustered MV grids and their weightings
+
+    Parameters
+    ----------
+    index : :pandas:`pandas.Index<index>`
+        MV grid ID's
+    X : :obj:`numpy.ndarray`
+        Normalised attributes of all MV grids
+    cluster_labels : :obj:`numpy.ndarray`
+        Cluster of each MV grid
+    centroids : :obj:`numpy.ndarray`
+        Centers of the clusters
+    representatives : None or :obj:`numpy.ndarray`
+        Position of the selected MV grid of each cluster. If None, the MV
+        grid closest to the cluster's center is selected.
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<dataframe>`
+        Dataframe containing the clustered MV grids and their weightings
+
+    """
+    # Distance from each point to its cluster's center (all attributes)
+    dist = np.linalg.norm(X - centroids[cluster_labels], axis=1)
+
+    points = pd.DataFrame(
+        {'cluster_id': cluster_labels, 'dist': dist},
+        index=index)
+    clusters = points.groupby('cluster_id', sort=False)
+
+    no_points_clus = clusters.size()
+
+    if representatives is None:
+        # the shortest distance point (selected network)
+        selected = clusters['dist'].idxmin()
+    else:
+        selected = pd.Series(index[representatives])
+
+    # Members of each cluster, ranked by the distance to the cluster's center
+    ranked = points.sort_values('dist', kind='mergesort')
+    represented = ranked.index.to_series().groupby(
+        ranked['cluster_id'].values).apply(list).reindex(no_points_clus.index)
 
-        id_clus_dist.setdefault(clus, []).append({id_[i]: dist})
-   
     cluster_df = pd.DataFrame(
-            columns=[
-            'no_of_points_per_cluster',
-            'cluster_percentage',
-            'the_selected_network_id',
-            'represented_grids'])
+        {'no_of_points_per_cluster': no_points_clus,
+         # percentage of points per cluster
+         'cluster_percentage': (no_points_clus / len(X) * 100).round(2),
+         'the_selected_network_id': selected,
+         'represented_grids': represented},
+        columns=CLUSTER_COLUMNS)
     cluster_df.index.name = 'cluster_id'
-   
-    for key, value in id_clus_dist.items():
-        no_points_clus = sum(1 for v in value if v)  
-        # percentage of points per cluster
-        clus_perc = (no_points_clus / len(X)) * 100
-
-        id_dist = {}
-        for value_1 in value:
-            id_dist.update(value_1)
-
-        # returns the shortest distance point (selected network) 
-        short_dist_net_id_dist = min(id_dist.items(), key=lambda x: x[1])
-        
-        cluster_df.loc[key] = [
-                no_points_clus,
-                round(clus_perc, 2),
-                short_dist_net_id_dist[0],
-                list(id_dist.keys())]
-        
+
     return cluster_df
+
+
+def _evaluate_clustering(cluster_base, X, no_clusters, backend, sample_size):
+    """
+    Clusters the MV grids and rates the result, see
+    :func:`evaluate_no_grids`
+
+    Returns
+    -------
+    :obj:`tuple`
+        Number of clusters, inertia, silhouette and cost error
+
+    """
+    cluster_labels, centroids, representatives = _fit_clusters(
+        X, no_clusters, backend=backend, sample_size=sample_size)
+    cluster_df = _cluster_df(
+        cluster_base.index, X, cluster_labels, centroids, representatives)
+
+    inertia = ((X - centroids[cluster_labels]) ** 2).sum()
+
+    silhouette = silhouette_score(
+        X, cluster_labels,
+        sample_size=min(len(X), 2000),
+        random_state=RANDOM_STATE)
+
+    # Attribute sums estimated by the weighted representative grids
+    representatives = cluster_base.loc[
+        cluster_df['the_selected_network_id']]
+    estimated = representatives.mul(
+        cluster_df['no_of_points_per_cluster'].values, axis=0).sum()
+    total = cluster_base.sum()
+    relative_error = ((estimated - total).abs() / total)[total != 0]
+    cost_error = relative_error.max() if len(relative_error) else 0.
+
+    return no_clusters, inertia, silhouette, cost_error
+
+
+def _fit_clusters(X, no_clusters, backend='kmeans', sample_size=None):
+    """
+    Clusters the points in X
+
+    Available backends are
+
+    * ``'kmeans'``: k-means on all points
+    * ``'minibatch'``: mini-batch k-means on all points. Much faster for
+      many points and repeated runs, at the expense of slightly higher
+      within-cluster dispersion
+    * ``'coreset'``: k-means on a random sample of the points. Afterwards,
+      all points are assigned exactly to the closest cluster center
+    * ``'hierarchical'``: Ward clustering, see :func:`_fit_hierarchy`. The
+      representatives of fewer clusters are always a subset of the
+      representatives of more clusters
+
+    All backends are deterministic (fixed random state).
+
+    Parameters
+    ----------
+    X : :obj:`numpy.ndarray`
+        Points (rows) and their normalised attributes (columns)
+    no_clusters : int
+        Number of clusters
+    backend : :obj:`str`
+        Clustering algorithm. Default: ``'kmeans'``
+    sample_size : None or int
+        Size of the sample in case of ``backend='coreset'``. Default: 20
+        points per cluster, but at least 1000 points
+
+    Returns
+    -------
+    cluster_labels : :obj:`numpy.ndarray`
+        Cluster of each point
+    centroids : :obj:`numpy.ndarray`
+        Centers of the clusters
+    representatives : None or :obj:`numpy.ndarray`
+        Position of the representative point of each cluster. None if the
+        point closest to the cluster center represents the cluster.
+
+    """
+    ran_state = RANDOM_STATE
+
+    if backend == 'kmeans':
+        model = KMeans(n_clusters=no_clusters, random_state=ran_state)
+        cluster_labels = model.fit_predict(X)
+
+    elif backend == 'minibatch':
+        model = MiniBatchKMeans(n_clusters=no_clusters, random_state=ran_state)
+        cluster_labels = model.fit_predict(X)
+
+    elif backend == 'coreset':
+        if sample_size is None:
+            sample_size = max(20 * no_clusters, 1000)
+        sample_size = max(min(sample_size, len(X)), no_clusters)
+
+        sample = np.random.RandomState(ran_state).choice(
+            len(X), size=sample_size, replace=False)
+        logger.info('Clustering a sample of {} of {} MV grids'.format(
+            sample_size, len(X)))
+
+        model = KMeans(n_clusters=no_clusters, random_state=ran_state)
+        model.fit(X[sample])
+        cluster_labels = model.predict(X)
+
+    elif backend == 'hierarchical':
+        return _fit_hierarchy(X, no_clusters)
+
+    else:
+        raise ValueError(
+            "Unknown cluster backend '{}', choose one of {}".format(
+                backend, CLUSTER_BACKENDS))
+
+    return cluster_labels, model.cluster_centers_, None
+
+
+def _fit_hierarchy(X, no_clusters):
+    """
+    Clusters the points in X by cutting a Ward linkage tree top-down
+
+    The tree is split at its highest remaining merge until there are
+    no_clusters clusters. The representative of the root is the point
+    closest to the center of all points. On each split, the child that
+    contains the representative of its parent keeps it, the other child is
+    represented by its point closest to its center. Thus, the
+    representatives of k clusters are a subset of the representatives of
+    all k' > k clusters.
+
+    Parameters
+    ----------
+    X : :obj:`numpy.ndarray`
+        Points (rows) and their normalised attributes (columns)
+    no_clusters : int
+        Number of clusters
+
+    Returns
+    -------
+    cluster_labels : :obj:`numpy.ndarray`
+        Cluster of each point
+    centroids : :obj:`numpy.ndarray`
+        Centers of the clusters
+    representatives : :obj:`numpy.ndarray`
+        Position of the representative point of each cluster
+
+    """
+    def closest_to_center(members):
+        points = X[members]
+        dist = np.linalg.norm(points - points.mean(axis=0), axis=1)
+        return members[np.argmin(dist)]
+
+    if len(X) == 1:
+        return np.zeros(1, dtype=int), X.copy(), np.zeros(1, dtype=int)
+
+    root = to_tree(linkage(X, method='ward'))
+    root_members = np.array(root.pre_order())
+
+    # Heap of the clusters, the highest merge first (single points last)
+    clusters = [(-root.dist, False, root.id, root,
+                 closest_to_center(root_members))]
+    while len(clusters) < no_clusters:
+        cluster = heapq.heappop(clusters)
+        height, is_leaf, node_id, node, representative = cluster
+        if is_leaf:
+            heapq.heappush(clusters, cluster)
+            break
+        for child in [node.get_left(), node.get_right()]:
+            members = np.array(child.pre_order())
+            if representative in members:
+                child_representative = representative
+            else:
+                child_representative = closest_to_center(members)
+            heapq.heappush(
+                clusters,
+                (-child.dist, child.is_leaf(), child.id, child,
+                 child_representative))
+
+    cluster_labels = np.zeros(len(X), dtype=int)
+    centroids = np.zeros((len(clusters), X.shape[1]))
+    representatives = np.zeros(len(clusters), dtype=int)
+    for label, (height, is_leaf, node_id, node, representative) in enumerate(
+            sorted(clusters, key=lambda cluster: cluster[2])):
+        members = node.pre_order()
+        cluster_labels[members] = label
+        centroids[label] = X[members].mean(axis=0)
+        representatives[label] = representative
+
+    return cluster_labels, centroids, representatives
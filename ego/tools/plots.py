@@ -33,6 +33,7 @@ if not 'READTHEDOCS' in os.environ:
                                    plot_voltage, plot_residual_load, coloring)
     from ego.tools.economics import etrago_convert_overnight_cost
     from ego.tools.utilities import open_oedb_session
+    from ego.tools.mv_cluster import read_grid_choice
     from pypsa import Network as PyPSANetwork
     import pyproj as proj
     from math import sqrt, log10
@@ -648,9 +649,7 @@ def plot_edisgo_cluster(ego, filename, region=['DE'], display=False, dpi=150,
     version = ego.json_file['eTraGo']['gridversion']
     # get cluster
     if grid_choice:
-        cluster = pd.read_csv(grid_choice, index_col=0)
-        cluster['represented_grids'] = cluster.apply(
-            lambda x: eval(x['represented_grids']), axis=1)
+        cluster = read_grid_choice(grid_choice)
     else:
         cluster = ego.edisgo.grid_choice
 
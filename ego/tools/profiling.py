@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+# Copyright 2016-2018 Europa-Universität Flensburg,
+# Flensburg University of Applied Sciences,
+# Centre for Sustainable Energy Systems
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation; either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# File description
+"""This module contains the registry of eGo's hot path timers.
+
+Profiling is switched off by default. In this case :func:`timer` returns a
+shared no-op context manager and :func:`record` returns immediately, so the
+instrumented code paths carry no measurable overhead.
+"""
+import os
+import logging
+import time
+
+import pandas as pd
+
+__copyright__ = ("Flensburg University of Applied Sciences, "
+                 "Europa-Universität Flensburg, "
+                 "Centre for Sustainable Energy Systems")
+__license__ = "GNU Affero General Public License Version 3 (AGPL-3.0)"
+__author__ = "wolf_bunke, maltesc"
+
+logger = logging.getLogger(__name__)
+
+_enabled = False
+_timings = []
+
+TIMING_COLUMNS = ['section', 'key', 'seconds']
+
+
+class _NoTimer:
+    """
+    Context manager that is used when profiling is switched off
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_TIMER = _NoTimer()
+
+
+class _Timer:
+    """
+    Context manager that records the elapsed time of its block
+    """
+
+    def __init__(self, section, key):
+        self.section = section
+        self.key = key
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.section, time.perf_counter() - self._start, self.key)
+        return False
+
+
+def enable():
+    """
+    Switches profiling on
+    """
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """
+    Switches profiling off. Already recorded timings are kept.
+    """
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    """
+    Returns
+    -------
+    bool
+        ``True`` if profiling is switched on
+    """
+    return _enabled
+
+
+def reset():
+    """
+    Deletes all recorded timings
+    """
+    del _timings[:]
+
+
+def timer(section, key=None):
+    """
+    Measures the execution time of a ``with`` block
+
+    Parameters
+    ----------
+    section : :obj:`str`
+        Name of the measured section (e.g. ``'eDisGo reinforcement'``)
+    key : None or :obj:`int` or :obj:`str`
+        Optional identifier of the measured object (e.g. MV grid ID)
+
+    Examples
+    --------
+    >>> with timer('Clustering'):
+    ...     cluster_mv_grids(no_grids, cluster_base)
+    """
+    if not _enabled:
+        return _NO_TIMER
+    return _Timer(section, key)
+
+
+def record(section, seconds, key=None):
+    """
+    Records an already measured time
+
+    Parameters
+    ----------
+    section : :obj:`str`
+        Name of the measured section
+    seconds : float
+        Measured time in seconds
+    key : None or :obj:`int` or :obj:`str`
+        Optional identifier of the measured object (e.g. MV grid ID)
+    """
+    if not _enabled:
+        return
+    _timings.append((section, key, seconds))
+
+
+def add_timings(timings):
+    """
+    Adds timings that were recorded in another process
+
+    Parameters
+    ----------
+    timings : :pandas:`pandas.DataFrame<dataframe>`
+        Timings as returned by :func:`get_timings`
+    """
+    if not _enabled:
+        return
+    _timings.extend(
+        timings[TIMING_COLUMNS].itertuples(index=False, name=None))
+
+
+def mark():
+    """
+    Returns
+    -------
+    int
+        Position in the recorded timings, see :func:`get_timings`
+    """
+    return len(_timings)
+
+
+def get_timings(key=None, since=0):
+    """
+    Returns the recorded timings
+
+    Parameters
+    ----------
+    key : None or :obj:`int` or :obj:`str`
+        If given, only timings of this key are returned
+    since : int
+        Only timings recorded after this position (see :func:`mark`) are
+        returned
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<dataframe>`
+        Timings with the columns ``section``, ``key`` and ``seconds``
+    """
+    timings = pd.DataFrame(_timings[since:], columns=TIMING_COLUMNS)
+    if key is not None:
+        timings = timings[timings['key'] == key]
+    return timings
+
+
+def report(filename=None):
+    """
+    Logs a summary of all recorded timings and optionally writes the single
+    timings to a csv file
+
+    Parameters
+    ----------
+    filename : None or :obj:`str`
+        Path of the csv file
+
+    Returns
+    -------
+    :pandas:`pandas.DataFrame<dataframe>`
+        Number of calls, total, mean and maximum time per section
+    """
+    timings = get_timings()
+
+    summary = timings.groupby('section')['seconds'].agg(
+        ['count', 'sum', 'mean', 'max']).sort_values('sum', ascending=False)
+
+    logger.info("\n\neGo performance report: \n\n"
+                + summary.to_string()
+                + "\n\n")
+
+    if filename is not None:
+        directory = os.path.dirname(filename)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        timings.to_csv(filename, index=False)
+
+    return summary
@@ -31,6 +31,7 @@ __author__ = "wolf_bunke,maltesc"
 import os
 import pandas as pd
 import time
+from ego.tools import profiling
 if not 'READTHEDOCS' in os.environ:
     from egoio.db_tables import model_draft
     from egoio.db_tables import supply
@@ -78,7 +79,6 @@ def get_etragospecs_direct(session,
         logger.info('Only active power interface')
 
     specs_meta_data = {}
-    performance = {}
 
     specs_meta_data.update({'TG Bus ID': bus_id})
 
@@ -123,7 +123,7 @@ def get_etragospecs_direct(session,
 
     # Conventionals
     t1 = time.perf_counter()
-    performance.update({'Generator Data Processing': t1-t0})
+    profiling.record('Specs: Generator Data Processing', t1-t0, bus_id)
 
     conv_df = all_gens_df[~all_gens_df.name.isin(weather_dpdnt)]
 
@@ -165,7 +165,7 @@ def get_etragospecs_direct(session,
 
     # Renewables
     t2 = time.perf_counter()
-    performance.update({'Conventional Dispatch': t2-t1})
+    profiling.record('Specs: Conventional Dispatch', t2-t1, bus_id)
     # Capacities
     ren_df = all_gens_df[all_gens_df.name.isin(weather_dpdnt)]
     if ren_df.empty:
@@ -303,7 +303,7 @@ def get_etragospecs_direct(session,
 
     # Storage
     t3 = time.perf_counter()
-    performance.update({'Renewable Dispatch and Curt.': t3-t2})
+    profiling.record('Specs: Renewable Dispatch and Curt.', t3-t2, bus_id)
     # Capactiy
     min_extended = 0.3
     stor_df = etrago_network.storage_units.loc[
@@ -339,7 +339,8 @@ def get_etragospecs_direct(session,
             "No extendable storage unit found at bus {}".format(bus_id))
 
     t4 = time.perf_counter()
-    performance.update({'Storage Data Processing and Dispatch': t4-t3})
+    profiling.record(
+        'Specs: Storage Data Processing and Dispatch', t4-t3, bus_id)
 
     specs = {
         'conv_dispatch': conv_dsptch,
@@ -361,6 +362,69 @@ def get_etragospecs_direct(session,
         specs['reactive_power'] = all_reactive_power
 
     t5 = time.perf_counter()
-    performance.update({'Overall time': t5-t0})
+    profiling.record('Specs: Overall time', t5-t0, bus_id)
 
     return specs
+
+
+def get_critical_timesteps(residual_load,
+                           no_timesteps,
+                           battery_p_series=None,
+                           curtailment=None):
+    """
+    Selects the most critical snapshots of a MV grid for eDisGo's power flow
+    analysis
+
+    The snapshots are ranked separately for every criterion (maximum load,
+    maximum residual feed-in, maximum storage discharge and charge and
+    maximum curtailment). The critical snapshots are then taken alternately
+    from the top of each ranking, so the worst case of every criterion is
+    always part of the selection.
+
+    Parameters
+    ----------
+    residual_load : :pandas:`pandas.Series<series>`
+        Residual load (load - generation) of the MV grid in kW
+    no_timesteps : int
+        Maximum number of snapshots to select
+    battery_p_series : None or :pandas:`pandas.Series<series>`
+        Storage dispatch of the MV grid in kW (charging is negative)
+    curtailment : None or :pandas:`pandas.DataFrame<dataframe>`
+        Absolute curtailment time series of the MV grid
+
+    Returns
+    -------
+    :pandas:`pandas.DatetimeIndex<datetimeindex>`
+        Sorted critical snapshots
+
+    """
+    # Max. load and max. residual feed-in are always considered
+    criteria = [residual_load, -residual_load]
+
+    optional_criteria = []
+    if battery_p_series is not None:
+        optional_criteria.extend([battery_p_series, -battery_p_series])
+    if curtailment is not None:
+        optional_criteria.append(curtailment.sum(axis=1))
+
+    # Criteria without any positive value do not indicate a critical case
+    criteria.extend([
+        criterion for criterion in optional_criteria
+        if criterion.max() > 0])
+
+    rankings = [
+        criterion.sort_values(ascending=False).index
+        for criterion in criteria]
+
+    critical_timesteps = []
+    for position in range(max(len(ranking) for ranking in rankings)):
+        for ranking in rankings:
+            if len(critical_timesteps) >= no_timesteps:
+                return pd.DatetimeIndex(critical_timesteps).sort_values()
+            if position >= len(ranking):
+                continue
+            timestep = ranking[position]
+            if timestep not in critical_timesteps:
+                critical_timesteps.append(timestep)
+
+    return pd.DatetimeIndex(critical_timesteps).sort_values()
@@ -29,6 +29,7 @@ if not 'READTHEDOCS' in os.environ:
     import pandas as pd
     import numpy as np
     from etrago.tools.utilities import geolocation_buses
+    from ego.tools.utilities import voltage_levels
 
 __copyright__ = ("Europa-Universität Flensburg, "
                  "Centre for Sustainable Energy Systems")
@@ -151,14 +152,8 @@ def etrago_storages_investment(network, json_file, session):
                                                   installed_storages.p_nom_opt)
 
         # add voltage_level
-        installed_storages['voltage_level'] = 'unknown'
-
-        ix_ehv = installed_storages[installed_storages['v_nom'] >= 380].index
-        installed_storages.set_value(ix_ehv, 'voltage_level', 'ehv')
-
-        ix_hv = installed_storages[(installed_storages['v_nom'] <= 220) &
-                                   (installed_storages['v_nom'] >= 110)].index
-        installed_storages.set_value(ix_hv, 'voltage_level', 'hv')
+        installed_storages['voltage_level'] = installed_storages['bus'].map(
+            voltage_levels(network, 'buses')).astype(str)
 
         # add country differentiation
         installed_storages['differentiation'] = 'none'
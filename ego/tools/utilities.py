@@ -21,6 +21,8 @@
 """
 import csv
 import os
+import weakref
+import numpy as np
 import pandas as pd
 import json
 import csv
@@ -33,6 +35,7 @@ if not 'READTHEDOCS' in os.environ:
 
     from egoio.db_tables import model_draft, grid
     from egoio.tools import db
+    import pypsa
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import scoped_session
 
@@ -212,6 +215,166 @@ def fix_leading_separator(csv_file, **kwargs):
             os.rename(tmp_file, csv_file)
 
 
+NETWORK_SNAPSHOT = 'network_snapshot.h5'
+NETWORK_SNAPSHOT_MANIFEST = 'network_snapshot.json'
+
+
+def _csv_manifest(csv_folder):
+    """
+    Returns modification time and size of all CSV files in csv_folder
+    """
+    manifest = {}
+    for file in sorted(os.listdir(csv_folder)):
+        if file.endswith('.csv'):
+            stat = os.stat(os.path.join(csv_folder, file))
+            manifest[file] = [stat.st_mtime_ns, stat.st_size]
+    return manifest
+
+
+def import_csv_network(csv_folder):
+    """
+    Imports a PyPSA network from a folder of CSV files (e.g. an eTraGo
+    result)
+
+    On the first import, a binary snapshot of the network
+    (``network_snapshot.h5``) and a manifest of the modification times and
+    sizes of all CSV files (``network_snapshot.json``) are written to
+    csv_folder. As long as the CSV files are unchanged, later imports read
+    the snapshot instead of parsing the CSV files.
+
+    Parameters
+    ----------
+    csv_folder : :obj:`str`
+        Path to the folder of CSV files
+
+    Returns
+    -------
+    :class:`pypsa.Network`
+        Imported network
+
+    """
+    snapshot_path = os.path.join(csv_folder, NETWORK_SNAPSHOT)
+    manifest_path = os.path.join(csv_folder, NETWORK_SNAPSHOT_MANIFEST)
+
+    manifest = _csv_manifest(csv_folder)
+
+    if os.path.isfile(snapshot_path) and os.path.isfile(manifest_path):
+        with open(manifest_path) as f:
+            snapshot_manifest = json.load(f)
+        if snapshot_manifest == manifest:
+            network = pypsa.Network()
+            network.import_from_hdf5(snapshot_path)
+            logger.info('Network imported from snapshot {}'.format(
+                snapshot_path))
+            return network
+
+    network = pypsa.Network()
+    try:
+        network.import_from_csv_folder(csv_folder)
+    except TypeError:
+        fix_leading_separator(os.path.join(csv_folder, 'network.csv'))
+        network = pypsa.Network()
+        network.import_from_csv_folder(csv_folder)
+        # network.csv may have been changed
+        manifest = _csv_manifest(csv_folder)
+
+    try:
+        # Written to a temporary file first, so that an interrupted export
+        # never leaves an incomplete snapshot behind
+        tmp_path = snapshot_path + '.tmp'
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        network.export_to_hdf5(tmp_path)
+        os.replace(tmp_path, snapshot_path)
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f)
+    except Exception as e:
+        logger.warning(
+            'No network snapshot written to {}: {!r}'.format(csv_folder, e))
+
+    return network
+
+
+VOLTAGE_LEVELS = ['ehv', 'hv', 'unknown']
+
+# Voltage levels per network and component, see voltage_levels()
+_voltage_level_cache = weakref.WeakKeyDictionary()
+
+
+def classify_voltage_level(v_nom):
+    """
+    Classifies nominal voltages into voltage levels: ``'ehv'`` from 380 kV,
+    ``'hv'`` from 110 kV to 220 kV, ``'unknown'`` otherwise
+
+    Parameters
+    ----------
+    v_nom : :pandas:`pandas.Series<series>`
+        Nominal voltages in kV
+
+    Returns
+    -------
+    :pandas:`pandas.Series<series>`
+        Categorical voltage levels (categories :attr:`VOLTAGE_LEVELS`),
+        same index as v_nom
+
+    """
+    levels = np.select(
+        [v_nom >= 380, (v_nom >= 110) & (v_nom <= 220)],
+        VOLTAGE_LEVELS[:2], default=VOLTAGE_LEVELS[2])
+
+    return pd.Series(
+        pd.Categorical(levels, categories=VOLTAGE_LEVELS),
+        index=v_nom.index, name='voltage_level')
+
+
+def voltage_levels(network, component='buses'):
+    """
+    Voltage levels of the components of a network
+
+    Buses and lines are classified by their nominal voltage, transformers
+    by the nominal voltage of their first bus (``v_nom0``), all other
+    components by their bus. The result is computed once per network and
+    component. It is computed again if the component dataframe is replaced
+    or its length changes, but not if nominal voltages are changed in place.
+
+    Parameters
+    ----------
+    network : :class:`pypsa.Network`
+        (eTraGo) network
+    component : :obj:`str`
+        Name of the component dataframe, e.g. ``'buses'``, ``'lines'``,
+        ``'transformers'``, ``'generators'`` or ``'storage_units'``
+
+    Returns
+    -------
+    :pandas:`pandas.Series<series>`
+        Categorical voltage levels, see :func:`classify_voltage_level`
+
+    """
+    df = getattr(network, component)
+
+    cache = _voltage_level_cache.setdefault(network, {})
+    cached = cache.get(component)
+    if cached is not None and cached[0] is df and len(cached[1]) == len(df):
+        return cached[1]
+
+    if component == 'buses' or (
+            component != 'transformers' and 'v_nom' in df.columns):
+        v_nom = df['v_nom']
+    elif component == 'transformers':
+        if 'v_nom0' in df.columns:
+            v_nom = df['v_nom0']
+        else:
+            v_nom = df['bus0'].map(network.buses['v_nom'])
+    else:
+        v_nom = df['bus'].map(network.buses['v_nom'])
+
+    levels = classify_voltage_level(v_nom)
+    cache[component] = (df, levels)
+
+    return levels
+
+
 def get_time_steps(json_file):
     """ Get time step of calculation by scenario settings.
 
@@ -45,6 +45,7 @@ setup(
                       'plotly==2.2.3',
                       'shapely',
                       'multiprocess',
+                      'tables',
                       'folium',
                       'oedialect'
                       ],